@@ -0,0 +1,307 @@
+# Benchmark suite for the extraction pipeline.
+# Times newsletter parsing over the bundled archive (single files, per-file, full archive serial and
+# parallel), main-text extraction over a saved corpus of article pages, and the URL helpers.
+# Results are written as JSON; a saved baseline is used to flag slowdowns, and golden outputs make
+# sure an optimisation cannot silently change what gets extracted.
+#
+# Usage (from the repo root):
+#   python benchmarks/run_benchmarks.py                  # run, compare with baseline, check golden output
+#   python benchmarks/run_benchmarks.py --save-baseline  # record this machine's timings as the baseline
+#   python benchmarks/run_benchmarks.py --update-golden  # accept the current extraction output as golden
+#   python benchmarks/run_benchmarks.py --only urls --repeat 10
+#   python benchmarks/run_benchmarks.py --articles-dir /path/to/http_cache   # extra pages (*.html / *.body)
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from glob import glob
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import extract00_newsletters as ex00  # noqa: E402
+import extract01_full_article as ex01  # noqa: E402
+import urls  # noqa: E402
+from html_backend import make_soup  # noqa: E402
+
+ARCHIVE = os.path.join(ROOT, "data", "data00_html_15.10.2025")
+ARTICLE_FIXTURES = os.path.join(HERE, "fixtures", "articles")
+GOLDEN_ITEMS = os.path.join(HERE, "golden", "newsletter_items.csv")
+GOLDEN_ARTICLES = os.path.join(HERE, "golden", "articles.json")
+BASELINE_JSON = os.path.join(HERE, "baselines", "baseline.json")
+RESULTS_JSON = os.path.join(HERE, "results", "latest.json")
+
+SINGLE_FILES = ("newsletter_01.html", "newsletter_44.html", "newsletter_87.html")
+REGRESSION_THRESHOLD = 1.25  # flag benchmarks whose median is >25% slower than baseline
+GROUPS = ("parse", "extract", "urls")
+
+
+# -----------------------------
+# TIMING
+# -----------------------------
+def measure(fn, repeat: int) -> dict:
+    """Run fn `repeat` times; wall-clock seconds per run."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "repeat": repeat,
+    }
+
+
+def archive_files():
+    return sorted(glob(os.path.join(ARCHIVE, "newsletter_*.html")))
+
+
+def article_pages(extra_dir=None) -> dict[str, str]:
+    """name -> HTML for the fixture corpus, plus any pages in extra_dir (*.html or cache *.body)."""
+    paths = sorted(glob(os.path.join(ARTICLE_FIXTURES, "*.html")))
+    if extra_dir:
+        paths += sorted(glob(os.path.join(extra_dir, "**", "*.html"), recursive=True))
+        paths += sorted(glob(os.path.join(extra_dir, "**", "*.body"), recursive=True))
+    pages = {}
+    for p in paths:
+        with open(p, "r", encoding="utf-8", errors="replace") as f:
+            pages[os.path.relpath(p, ROOT)] = f.read()
+    return pages
+
+
+# -----------------------------
+# BENCHMARKS
+# -----------------------------
+def bench_parse(repeat: int) -> dict:
+    files = archive_files()
+    out = {}
+
+    for name in SINGLE_FILES:
+        path = os.path.join(ARCHIVE, name)
+        if os.path.exists(path):
+            out[f"parse.single_file[{name}]"] = measure(lambda: ex00.parse_file(path), repeat)
+
+    # Stages inside parse_file on one large issue, with the soup built once
+    path = os.path.join(ARCHIVE, SINGLE_FILES[-1])
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        html = f.read()
+    out["parse.soup_build"] = measure(lambda: make_soup(html, ex00.HTML_PARSER), repeat)
+    soup = make_soup(html, ex00.HTML_PARSER)
+    out["parse.block_table"] = measure(lambda: ex00.block_table(soup), repeat)
+
+    per_file = []
+    for fp in files:
+        t0 = time.perf_counter()
+        ex00.parse_file(fp)
+        per_file.append(time.perf_counter() - t0)
+    out["parse.per_file"] = {
+        "min": min(per_file),
+        "median": statistics.median(per_file),
+        "mean": statistics.fmean(per_file),
+        "max": max(per_file),
+        "files": len(per_file),
+        "repeat": 1,
+    }
+
+    out["parse.archive_serial"] = measure(lambda: list(ex00.parse_files(files, workers=1)), max(1, repeat // 3))
+    out["parse.archive_parallel"] = measure(lambda: list(ex00.parse_files(files)), max(1, repeat // 3))
+    out["parse.archive_parallel"]["workers"] = ex00.WORKERS
+    return out
+
+
+def bench_extract(repeat: int, pages: dict) -> dict:
+    htmls = list(pages.values())
+    out = {"extract.corpus": measure(lambda: [ex01.extract_article(h) for h in htmls], repeat)}
+    out["extract.corpus"]["pages"] = len(htmls)
+    out["extract.corpus"]["bytes"] = sum(len(h) for h in htmls)
+    return out
+
+
+def bench_urls(repeat: int) -> dict:
+    if os.path.exists(GOLDEN_ITEMS):
+        links = pd.read_csv(GOLDEN_ITEMS, usecols=["link"], dtype=str, keep_default_na=False)["link"]
+    else:
+        links = [r["link"] for _, rows, _ in ex00.parse_files(archive_files(), workers=1) for r in rows]
+    raw = [l for l in links if l] * 5  # the repeated-link pattern seen across stages
+    series = pd.Series(raw)
+
+    def cold():
+        urls.canonical_url.cache_clear()
+        urls.is_safelink.cache_clear()
+        for u in raw:
+            urls.canonical_url(u)
+
+    out = {
+        "urls.canonical_url_cold": measure(cold, repeat),
+        "urls.canonical_url_warm": measure(lambda: [urls.canonical_url(u) for u in raw], repeat),
+        "urls.canonical_url_uncached": measure(lambda: [urls.canonical_url.__wrapped__(u) for u in raw], repeat),
+        "urls.canonicalise_many_series": measure(lambda: urls.canonicalise_many(series), repeat),
+        "urls.strip_tracking": measure(lambda: [urls.strip_tracking(u) for u in raw], repeat),
+        "urls.url_table_ids": measure(lambda: urls.UrlTable().ids(series), repeat),
+    }
+    for v in out.values():
+        v["calls"] = len(raw)
+    return out
+
+
+# -----------------------------
+# GOLDEN OUTPUT
+# -----------------------------
+def current_items_csv() -> str:
+    rows = []
+    for fp, file_rows, error in ex00.parse_files(archive_files(), workers=1):
+        if error:
+            raise RuntimeError(f"Error parsing {os.path.basename(fp)}: {error}")
+        rows.extend(file_rows)
+    return pd.DataFrame(rows, columns=ex00.PARSED_COLUMNS).to_csv(index=False)
+
+
+def current_articles(pages: dict) -> dict:
+    out = {}
+    for name, html in pages.items():
+        a = ex01.extract_article(html)
+        out[name] = {
+            "title": a.title,
+            "text": a.text,
+            "container": a.container.name if a.container is not None else None,
+        }
+    return out
+
+
+def check_golden(update: bool) -> bool:
+    """Compare current outputs with the golden files (or rewrite them). True if all match."""
+    items = current_items_csv()
+    articles = current_articles(article_pages())
+
+    if update:
+        os.makedirs(os.path.dirname(GOLDEN_ITEMS), exist_ok=True)
+        with open(GOLDEN_ITEMS, "w", encoding="utf-8", newline="") as f:
+            f.write(items)
+        with open(GOLDEN_ARTICLES, "w", encoding="utf-8") as f:
+            json.dump(articles, f, indent=1, ensure_ascii=False, sort_keys=True)
+        print(f"📝 Golden outputs updated ({items.count(chr(10)) - 1} items, {len(articles)} articles)")
+        return True
+
+    ok = True
+    with open(GOLDEN_ITEMS, "r", encoding="utf-8", newline="") as f:
+        golden_items = f.read()
+    if items != golden_items:
+        ok = False
+        got, want = items.splitlines(), golden_items.splitlines()
+        diffs = [i for i, (a, b) in enumerate(zip(want, got)) if a != b]
+        print(f"❌ newsletter items differ from golden: {len(got) - 1} vs {len(want) - 1} rows, "
+              f"{len(diffs)} changed")
+        for i in diffs[:3]:
+            print(f"   - {want[i]}\n   + {got[i]}")
+    else:
+        print("✅ newsletter items match golden output")
+
+    with open(GOLDEN_ARTICLES, "r", encoding="utf-8") as f:
+        golden_articles = json.load(f)
+    changed = sorted(k for k in set(golden_articles) | set(articles)
+                     if golden_articles.get(k) != articles.get(k))
+    if changed:
+        ok = False
+        print(f"❌ article extraction differs from golden for: {', '.join(changed)}")
+    else:
+        print("✅ article extraction matches golden output")
+    return ok
+
+
+# -----------------------------
+# REPORTING
+# -----------------------------
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "html_parser": ex00.HTML_PARSER,
+        "article_parser": ex01.HTML_PARSER,
+    }
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """Names of benchmarks whose median regressed beyond REGRESSION_THRESHOLD."""
+    regressed = []
+    base = baseline.get("benchmarks", {})
+    print(f"\n{'benchmark':<44}{'median (ms)':>14}{'baseline':>12}{'ratio':>8}")
+    for name, r in results.items():
+        b = base.get(name)
+        ratio = r["median"] / b["median"] if b and b["median"] else None
+        flag = ""
+        if ratio and ratio > REGRESSION_THRESHOLD:
+            regressed.append(name)
+            flag = "  ⚠️"
+        print(f"{name:<44}{r['median'] * 1000:>14.2f}"
+              f"{(b['median'] * 1000 if b else float('nan')):>12.2f}"
+              f"{(ratio if ratio else float('nan')):>8.2f}{flag}")
+    return regressed
+
+
+def write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark suite for the extraction pipeline.")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default=",".join(GROUPS), help=f"comma-separated subset of {GROUPS}")
+    ap.add_argument("--articles-dir", help="extra article pages to time (e.g. the HTTP cache directory)")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--update-golden", action="store_true")
+    ap.add_argument("--skip-golden", action="store_true")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args(argv)
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    results = {}
+    if "parse" in groups:
+        results.update(bench_parse(args.repeat))
+    if "extract" in groups:
+        results.update(bench_extract(args.repeat, article_pages(args.articles_dir)))
+    if "urls" in groups:
+        results.update(bench_urls(args.repeat))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "benchmarks": results,
+    }
+    write_json(RESULTS_JSON, report)
+
+    baseline = {}
+    if os.path.exists(BASELINE_JSON):
+        with open(BASELINE_JSON, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressed = compare(results, baseline)
+
+    if args.save_baseline:
+        write_json(BASELINE_JSON, report)
+        print(f"\n💾 Baseline saved to {os.path.relpath(BASELINE_JSON, ROOT)}")
+    print(f"📊 Results written to {os.path.relpath(RESULTS_JSON, ROOT)}\n")
+
+    golden_ok = True if args.skip_golden else check_golden(args.update_golden)
+
+    if not golden_ok:
+        return 1
+    if regressed and args.fail_on_regression:
+        print(f"❌ {len(regressed)} benchmark(s) slower than baseline: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
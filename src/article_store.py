@@ -0,0 +1,152 @@
+# Durable, append-only store for scraped article rows, so a crashed or interrupted
+# extract01_full_article run can pick up where it stopped.
+# Rows are written as JSON Lines the moment each URL finishes (flushed + fsynced), and every
+# run start / finish is appended to a small run journal next to it.
+# On restart the latest row per link_canonical wins: "ok" links are skipped, everything else is retried.
+# A row cut off mid-write by a hard kill is truncated before the next run appends, so the torn row
+# is retried rather than swallowing the first row written after it.
+
+import json
+import os
+import threading
+import time
+import uuid
+
+
+class ArticleStore:
+    """
+    Append-only JSONL store of article rows plus a run journal (`<path>.runs.jsonl`).
+    Safe to append to from several fetch threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".runs.jsonl"
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._checked = set()  # files whose tail has been checked before this store's first append
+
+    # ---- low-level append ----
+    @staticmethod
+    def _drop_torn_tail(path: str) -> int:
+        """
+        Truncate a last line without its newline (a write cut off by a hard kill), so the next
+        append starts a line of its own instead of being glued onto the fragment. Returns the
+        number of bytes dropped.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            # Walk back in blocks to the last newline
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                block = f.read(end - start)
+                if end == size and block.endswith(b"\n"):
+                    return 0
+                newline = block.rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+        return size - end
+
+    def _append(self, path: str, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if path not in self._checked:
+                dropped = self._drop_torn_tail(path)
+                if dropped:
+                    print(f"🩹 Dropped a torn {dropped}-byte last line from {path}")
+                self._checked.add(path)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _read(path: str):
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn last line from a hard kill (cut off before the next append)
+                    continue
+
+    # ---- rows ----
+    def append(self, row: dict) -> None:
+        self._append(self.path, row)
+
+    def offsets(self) -> dict[str, int]:
+        """Byte offset of the latest stored row for each link_canonical (rows stay on disk)."""
+        out = {}
+        if not os.path.exists(self.path):
+            return out
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    url = json.loads(line).get("link_canonical")
+                except ValueError:
+                    url = None
+                if url:
+                    out[url] = offset
+                offset += len(line)
+        return out
+
+    def read_at(self, offset: int) -> dict:
+        return next(self.rows_at([offset]))
+
+    def rows_at(self, offsets):
+        """Rows stored at the given byte offsets, read with one open file handle."""
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def latest(self) -> dict[str, dict]:
+        """Latest stored row for each link_canonical."""
+        out = {}
+        for row in self._read(self.path):
+            url = row.get("link_canonical")
+            if url:
+                out[url] = row
+        return out
+
+    def completed(self) -> set[str]:
+        """Links whose latest attempt succeeded; these are not fetched again."""
+        status = {}
+        for row in self._read(self.path):
+            url = row.get("link_canonical")
+            if url:
+                status[url] = row.get("status")
+        return {url for url, st in status.items() if st == "ok"}
+
+    # ---- run journal ----
+    def start_run(self, total: int, pending: int) -> str:
+        self.run_id = str(uuid.uuid4())
+        self._append(self.journal_path, {
+            "event": "start", "run_id": self.run_id, "at": time.time(),
+            "total_links": total, "pending_links": pending,
+        })
+        return self.run_id
+
+    def finish_run(self, status: str = "finished", **counts) -> None:
+        self._append(self.journal_path, {
+            "event": status, "run_id": self.run_id, "at": time.time(), **counts,
+        })
+
+    def runs(self) -> list[dict]:
+        return list(self._read(self.journal_path))
@@ -0,0 +1,65 @@
+# Crash-resume check for the incremental article store (article_store.py).
+# Writes rows, cuts the file off mid-row the way a hard kill would, resumes appending and fails
+# (exit code 1) unless every row written after the torn one reads back, through both latest() and
+# the offsets() / rows_at() path extract01_full_article uses for its output tables.
+#
+# Usage:  python src/check_article_store.py
+
+import os
+import sys
+import tempfile
+
+from article_store import ArticleStore
+
+
+def row(name: str, status: str = "ok") -> dict:
+    return {"link_canonical": f"https://example.org/{name}", "status": status, "article_text": name * 20}
+
+
+def check(torn_bytes: int) -> list[str]:
+    """Problems found resuming after the last row lost all but `torn_bytes` of its bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "articles.jsonl")
+        store = ArticleStore(path)
+        store.append(row("a"))
+        store.append(row("b"))
+        # Hard kill mid-write: keep only the first torn_bytes of b's line, no newline
+        with open(path, "rb") as f:
+            lines = f.readlines()
+        with open(path, "wb") as f:
+            f.write(lines[0] + lines[1][:torn_bytes])
+
+        resumed = ArticleStore(path)
+        resumed.append(row("c"))
+        resumed.append(row("d", status="error"))
+
+        problems = []
+        latest = resumed.latest()
+        expected = [f"https://example.org/{n}" for n in ("a", "c", "d")]
+        if sorted(latest) != expected:
+            problems.append(f"latest() has {sorted(latest)}, expected {expected}")
+        if resumed.completed() != {expected[0], expected[1]}:
+            problems.append(f"completed() is {sorted(resumed.completed())}")
+        offsets = resumed.offsets()
+        read_back = [r["link_canonical"] for r in resumed.rows_at(offsets[url] for url in expected if url in offsets)]
+        if read_back != expected:
+            problems.append(f"rows_at(offsets()) read {read_back}, expected {expected}")
+        return problems
+
+
+def main() -> int:
+    failed = False
+    for torn_bytes in (0, 1, 25):
+        problems = check(torn_bytes)
+        if problems:
+            failed = True
+            print(f"❌ Resume after a row torn at {torn_bytes} bytes:")
+            for problem in problems:
+                print(f"   {problem}")
+        else:
+            print(f"✅ Resume after a row torn at {torn_bytes} bytes keeps every later row")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
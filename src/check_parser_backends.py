@@ -0,0 +1,59 @@
+# Output-equivalence harness for the HTML parser backends.
+# Parses the bundled newsletter archive with the reference backend (html.parser) and with every
+# other installed backend, and fails (exit code 1) if any backend changes the newsletter_items.csv
+# content, including the content-derived item ids.
+#
+# Usage:  python src/check_parser_backends.py [backend ...]
+
+import os
+import sys
+from glob import glob
+
+import pandas as pd
+
+from extract00_newsletters import OUTPUT_COLUMNS, parse_files
+from html_backend import available_parsers
+
+ARCHIVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "data00_html_15.10.2025")
+REFERENCE_PARSER = "html.parser"
+
+
+def items_csv(files, parser: str) -> str:
+    """newsletter_items.csv content for the given backend, as text."""
+    rows = []
+    for fp, file_rows, error in parse_files(files, workers=1, parser=parser):
+        if error:
+            raise RuntimeError(f"{parser}: error parsing {os.path.basename(fp)}: {error}")
+        rows.extend(file_rows)
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS).to_csv(index=False)
+
+
+def main(backends=None) -> int:
+    files = sorted(glob(os.path.join(ARCHIVE, "newsletter_*.html")))
+    if not files:
+        print(f"No newsletter_*.html files found in {ARCHIVE}")
+        return 1
+
+    backends = backends or [p for p in available_parsers() if p != REFERENCE_PARSER]
+    reference = items_csv(files, REFERENCE_PARSER)
+    ref_lines = reference.splitlines()
+    print(f"📄 {REFERENCE_PARSER}: {len(ref_lines) - 1} items from {len(files)} files (reference)")
+
+    failed = False
+    for parser in backends:
+        lines = items_csv(files, parser).splitlines()
+        if lines == ref_lines:
+            print(f"✅ {parser}: identical output")
+            continue
+
+        failed = True
+        diffs = [i for i, (a, b) in enumerate(zip(ref_lines, lines)) if a != b]
+        print(f"❌ {parser}: {len(lines) - 1} items vs {len(ref_lines) - 1}; {len(diffs)} differing rows")
+        for i in diffs[:5]:
+            print(f"   - {ref_lines[i]}\n   + {lines[i]}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,117 @@
+# Content-type sniffing and charset detection for fetched pages.
+# Newsletter links often point at PDFs, Office documents and images rather than web pages;
+# classify_content() spots those from the Content-Type header and the first bytes of the body
+# (magic numbers), so fetch_html can stop before downloading and parsing them as HTML.
+# detect_charset() decodes with the declared charset where there is one and only runs the
+# (slow) statistical detector over a bounded prefix of the body.
+
+import re
+
+from requests.compat import chardet
+
+# Bytes of the body inspected for magic numbers / <meta charset> / statistical detection
+SNIFF_BYTES = 2048
+CHARSET_SNIFF_BYTES = 64 * 1024
+
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+# Types that may still be HTML served with a lazy header; the body decides
+AMBIGUOUS_TYPES = {"", "text/plain", "application/octet-stream", "binary/octet-stream"}
+
+# (magic prefix, failure reason)
+MAGIC = (
+    (b"%PDF-", "non_html_pdf"),
+    (b"PK\x03\x04", "non_html_office"),          # docx / xlsx / pptx / zip
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "non_html_office"),  # legacy .doc / .xls / .ppt
+    (b"\x89PNG\r\n\x1a\n", "non_html_image"),
+    (b"\xff\xd8\xff", "non_html_image"),
+    (b"GIF87a", "non_html_image"),
+    (b"GIF89a", "non_html_image"),
+    (b"\x1f\x8b", "non_html_archive"),
+)
+
+TYPE_REASONS = {
+    "application/pdf": "non_html_pdf",
+    "application/msword": "non_html_office",
+    "application/zip": "non_html_archive",
+}
+TYPE_PREFIX_REASONS = (
+    ("application/vnd.openxmlformats", "non_html_office"),
+    ("application/vnd.ms-", "non_html_office"),
+    ("image/", "non_html_image"),
+    ("video/", "non_html_media"),
+    ("audio/", "non_html_media"),
+)
+
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I)
+HTML_START_RE = re.compile(rb"^\s*(?:<!doctype\s+html|<html|<head|<body|<!--|<\w+)", re.I)
+
+
+def media_type(content_type: str | None) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def reason_from_type(content_type: str | None) -> str | None:
+    """Failure reason from the Content-Type header alone, or None if it may be HTML."""
+    mt = media_type(content_type)
+    if mt in HTML_TYPES or mt in AMBIGUOUS_TYPES:
+        return None
+    if mt in TYPE_REASONS:
+        return TYPE_REASONS[mt]
+    for prefix, reason in TYPE_PREFIX_REASONS:
+        if mt.startswith(prefix):
+            return reason
+    return f"non_html_{mt.split('/', 1)[-1].replace('+', '_').replace('-', '_').replace('.', '_')}"
+
+
+def classify_content(content_type: str | None, head: bytes) -> str | None:
+    """
+    None if the response looks like HTML, else a failure reason such as "non_html_pdf".
+    Magic numbers win over the header (servers send PDFs as text/html surprisingly often).
+    """
+    start = head.lstrip()[:16]
+    for magic, reason in MAGIC:
+        if start.startswith(magic):
+            return reason
+    reason = reason_from_type(content_type)
+    if reason:
+        return reason
+    if media_type(content_type) in AMBIGUOUS_TYPES and head and not HTML_START_RE.match(head):
+        return "non_html_unknown"
+    return None
+
+
+def declared_charset(content_type: str | None) -> str | None:
+    m = re.search(r"charset\s*=\s*[\"']?([^\s;\"']+)", content_type or "", re.I)
+    return m.group(1) if m else None
+
+
+def detect_charset(content_type: str | None, body: bytes) -> str:
+    """
+    Encoding to decode `body` with: the Content-Type charset, else a <meta charset> near the top,
+    else charset detection over the first CHARSET_SNIFF_BYTES only (not the whole payload).
+    """
+    for candidate in (declared_charset(content_type), _meta_charset(body)):
+        if candidate and _known_codec(candidate):
+            return candidate
+    prefix = body[:CHARSET_SNIFF_BYTES]
+    try:
+        prefix.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the prefix boundary is still UTF-8
+        if e.start >= len(prefix) - 3 and len(body) > len(prefix):
+            return "utf-8"
+    return chardet.detect(prefix).get("encoding") or "utf-8"
+
+
+def _meta_charset(body: bytes) -> str | None:
+    m = META_CHARSET_RE.search(body[:SNIFF_BYTES * 2])
+    return m.group(1).decode("ascii", errors="ignore") if m else None
+
+
+def _known_codec(name: str) -> bool:
+    try:
+        "".encode(name)
+        return True
+    except LookupError:
+        return False
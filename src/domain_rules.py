@@ -0,0 +1,166 @@
+# Per-domain extraction rules for the high-volume sources (see notebooks/3_retrospective_scraping:
+# schools_week, uk_government, guardian, nfer, epi, ... account for most links).
+# A rule names the content container and title selectors for a site and the boilerplate to drop
+# inside the container, so extract01_full_article can go straight to the article body instead of
+# scoring every container on the page. Pages where the rule finds nothing usable fall back to the
+# generic heuristic, so a stale selector costs a little time, never an article.
+#
+# Check the rules against pages already in the HTTP cache (hit rate, time saved, text agreement):
+#   python src/domain_rules.py --cache /workspaces/ERP_Newsletter/data/data04_full_articles_scraped/http_cache
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class DomainRule(NamedTuple):
+    name: str                  # organisation label, as in notebook 0's domain_to_org
+    domains: tuple             # hosts; subdomains match too ("gov.uk" covers "www.gov.uk")
+    content: tuple             # CSS selectors for the article container, tried in order
+    title: tuple = ("h1",)     # CSS selectors for the title, tried in order (else <title>)
+    drop: tuple = ()           # boilerplate inside the container (share bars, related links, ...)
+
+
+# Always removed from a matched container
+ALWAYS_DROP = ("script", "style", "noscript")
+
+RULES = (
+    DomainRule(
+        "schools_week", ("schoolsweek.co.uk", "feweek.co.uk"),
+        content=("div.entry-content", "article .post-content", "article"),
+        drop=(".sharedaddy", ".related-posts", ".jp-relatedposts", ".newsletter-signup", "aside"),
+    ),
+    DomainRule(
+        "uk_government", ("www.gov.uk",),
+        content=("div.govspeak", "main#content", "main"),
+        title=("h1.gem-c-title__text", "h1"),
+        drop=(".gem-c-contextual-sidebar", ".gem-c-print-link", ".gem-c-related-navigation",
+              ".gem-c-contents-list"),
+    ),
+    DomainRule(
+        "uk_government_blogs", ("blog.gov.uk",),
+        content=("div.entry-content", "article", "main"),
+        drop=(".sharing", ".comments", "aside"),
+    ),
+    DomainRule(
+        "guardian", ("theguardian.com",),
+        content=("div.article-body-commercial-selector", "div#maincontent", "article"),
+        drop=("aside", "figure", "[data-spacefinder-role='inline']", "[data-component='rich-link']"),
+    ),
+    DomainRule(
+        "conversation", ("theconversation.com",),
+        content=("div[itemprop='articleBody']", "div.content-body", "article"),
+        drop=("figure", "aside", ".disclosure"),
+    ),
+    DomainRule(
+        "bbc", ("bbc.co.uk", "bbc.com"),
+        content=("article", "main"),
+        drop=("[data-component='links-block']", "[data-component='tag-list']",
+              "[data-component='topic-list']", "[data-component='image-block']", "figure"),
+    ),
+    DomainRule(
+        "wordpress_research", (
+            "epi.org.uk", "bera.ac.uk", "ffteducationdatalab.org.uk", "teachertapp.co.uk",
+            "teachertapp.com", "upen.ac.uk", "fed.education", "wonkhe.com", "hepi.ac.uk",
+        ),
+        content=("div.entry-content", "div.post-content", "article", "main"),
+        drop=(".sharedaddy", ".share", ".related", ".wp-block-buttons", "aside"),
+    ),
+    DomainRule(
+        "research_orgs", (
+            "nfer.ac.uk", "nuffieldfoundation.org", "instituteforgovernment.org.uk", "ifs.org.uk",
+            "childrenscommissioner.gov.uk", "ippr.org", "ukri.org", "nesta.org.uk", "nao.org.uk",
+            "thebritishacademy.ac.uk", "literacytrust.org.uk", "5rightsfoundation.com",
+        ),
+        content=("main article", "article", "main"),
+        drop=("nav", "aside", "form", ".share", ".related"),
+    ),
+    DomainRule(
+        "uk_parliament", (
+            "committees.parliament.uk", "commonslibrary.parliament.uk", "lordslibrary.parliament.uk",
+            "post.parliament.uk", "hansard.parliament.uk",
+        ),
+        content=("main article", "div.main-content", "main", "article"),
+        drop=("nav", "aside", ".share"),
+    ),
+)
+
+
+@lru_cache(maxsize=4096)
+def rule_for(domain: str | None) -> DomainRule | None:
+    """The rule for a host (exact host or any parent domain listed by a rule), else None."""
+    host = (domain or "").lower().split(":", 1)[0]
+    while host:
+        rule = _BY_DOMAIN.get(host)
+        if rule:
+            return rule
+        _, _, host = host.partition(".")
+    return None
+
+
+_BY_DOMAIN = {d: rule for rule in RULES for d in rule.domains}
+
+
+# -----------------------------
+# EVALUATION AGAINST CACHED PAGES
+# -----------------------------
+def evaluate(pages) -> dict:
+    """
+    Run both extraction paths over (url, html) pages and compare.
+    Returns {rule name: {"pages", "hits", "rule_seconds", "generic_seconds", "same_text"}}.
+    """
+    from urllib.parse import urlparse
+
+    import extract01_full_article as ex01
+
+    stats = defaultdict(lambda: {"pages": 0, "hits": 0, "rule_seconds": 0.0,
+                                 "generic_seconds": 0.0, "same_text": 0})
+    for url, html in pages:
+        rule = rule_for(urlparse(url).netloc)
+        if rule is None:
+            continue
+        s = stats[rule.name]
+        s["pages"] += 1
+
+        t0 = time.perf_counter()
+        fast = ex01.extract_article(html, domain=urlparse(url).netloc)
+        t1 = time.perf_counter()
+        generic = ex01.extract_article(html)
+        t2 = time.perf_counter()
+
+        s["rule_seconds"] += t1 - t0
+        s["generic_seconds"] += t2 - t1
+        if fast.rule:
+            s["hits"] += 1
+        if fast.text == generic.text:
+            s["same_text"] += 1
+    return dict(stats)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Check domain extraction rules against cached pages.")
+    ap.add_argument("--cache", required=True, help="HTTP cache directory used by extract01_full_article")
+    args = ap.parse_args(argv)
+
+    from http_cache import HttpCache
+
+    cache = HttpCache(args.cache)
+    stats = evaluate((entry.url, entry.text) for entry in cache.iter_entries() if entry.status == 200)
+    if not stats:
+        print("No cached pages match a domain rule.")
+        return 0
+
+    print(f"{'rule':<24}{'pages':>7}{'hit rate':>10}{'same text':>11}{'rule ms':>10}{'generic ms':>12}{'saved':>8}")
+    for name, s in sorted(stats.items(), key=lambda kv: -kv[1]["pages"]):
+        saved = 1 - s["rule_seconds"] / s["generic_seconds"] if s["generic_seconds"] else 0.0
+        print(f"{name:<24}{s['pages']:>7}{s['hits'] / s['pages']:>10.0%}{s['same_text'] / s['pages']:>11.0%}"
+              f"{s['rule_seconds'] / s['pages'] * 1000:>10.1f}{s['generic_seconds'] / s['pages'] * 1000:>12.1f}"
+              f"{saved:>8.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
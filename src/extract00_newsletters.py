@@ -1,19 +1,61 @@
 #This script automatically parses all newsletter HTML files, extracts each item's theme, subtheme, title, description, and link (with full cleaning, URL normalisation, and deduplication), and saves the structured dataset as newsletter_items.csv for downstream analysis.
 
+import hashlib
+import json
 import os
 import re
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
-from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
+from typing import NamedTuple
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
 import pandas as pd
 
+from html_backend import default_parser, make_soup
+from metrics import METRICS, Metrics, instrumented_run
+from organisations import ORG_COLUMNS, ORG_RULES_CSV, ORG_SCHEMA, load_classifier
+from pipeline_db import PipelineDB
+from row_writer import ITEM_SCHEMA, RowWriter, read_table, with_format
+from text_normalise import ITEM_TEXT_COLUMNS, TextNormaliser
+from urls import SAFE_HOSTS, TRACK_PARAMS, canonical_url, is_safelink, strip_tracking
+
 # -----------------------------
 # CONFIG
 # -----------------------------
 FOLDER = "/workspaces/ERP_Newsletter/data/data00_html_15.10.2025"
 OUTPUT_CSV = "/workspaces/ERP_Newsletter/data/data01_newsletter_items/newsletter_items.csv"
+# "csv" or "parquet" (typed, categorical theme/subtheme; needs pyarrow). Parquet swaps the extension.
+OUTPUT_FORMAT = "csv"
+
+# Incremental mode: only new/changed files are reparsed; the manifest records each file's
+# content hash and the item ids it produced. Bump PARSER_VERSION when parsing logic changes.
+INCREMENTAL = True
+MANIFEST_JSON = "/workspaces/ERP_Newsletter/data/data01_newsletter_items/newsletter_items.manifest.json"
+# Shared SQLite store (pipeline_db.py): newsletters + items are upserted here too. None to skip.
+PIPELINE_DB = "/workspaces/ERP_Newsletter/data/pipeline.sqlite"
+PARSER_VERSION = 2
+
+# Normalise item text (mojibake, NFKC, whitespace) as rows are written; unchanged files were
+# normalised when they were first written (PARSER_VERSION 2 reparses older outputs once)
+NORMALISE_TEXT = True
+
+PARSED_COLUMNS = [
+    "id", "newsletter_number", "issue_date",
+    "theme", "subtheme", "title", "description", "link"
+]
+OUTPUT_COLUMNS = PARSED_COLUMNS + list(ORG_COLUMNS)
+# Organisation columns come from the maintained domain rules (organisations.py); rows reused from
+# the previous output are re-tagged too, so a rules edit never needs a reparse. None to skip.
+ORGANISATION_RULES = ORG_RULES_CSV
+
+# HTML parser backend (see html_backend.py); lxml when installed, else the stdlib html.parser
+HTML_PARSER = default_parser()
+
+# Parallel parsing: files are spread over a process pool (WORKERS <= 1 parses serially)
+WORKERS = os.cpu_count() or 1
+CHUNKSIZE = 4  # files handed to a worker at a time
 
 # Theme & subtheme bars (add shades seen across issues)
 DARK_BLUE_BG = {c.upper() for c in [
@@ -35,59 +77,28 @@ ANCHOR_ONLY_TOKENS = {
     "youtube", "tes", "gov.uk", "schoolsweek", "bera", "book now", "book on this link"
 }
 
-SAFE_HOSTS = {
-    "eur01.safelinks.protection.outlook.com",
-    "safelinks.protection.outlook.com",
-    "nam01.safelinks.protection.outlook.com",
-    "emea01.safelinks.protection.outlook.com",
-}
-
-TRACK_PARAMS = {
-    "utm_source","utm_medium","utm_campaign","utm_term","utm_content",
-    "mkt_tok","mc_cid","mc_eid","gclid","fbclid","igshid","utm_name"
-}
-
 # -----------------------------
-# URL NORMALISATION / DEDUPE HELPERS
+# DEDUPE / ID HELPERS
 # -----------------------------
-def is_safelink(u: str) -> bool:
-    try:
-        return urlparse(u).netloc.lower() in SAFE_HOSTS
-    except Exception:
-        return False
+# URL normalisation (canonical_url, is_safelink, strip_tracking) lives in urls.py and is
+# imported above, so `from extract00_newsletters import canonical_url` keeps working.
 
-def strip_tracking(u: str) -> str:
-    try:
-        p = urlparse(u)
-        q = parse_qs(p.query, keep_blank_values=True)
-        q2 = {k: v for k, v in q.items() if k.lower() not in TRACK_PARAMS}
-        return urlunparse(p._replace(query=urlencode(q2, doseq=True)))
-    except Exception:
-        return u
-
-def canonical_url(u: str) -> str:
-    """Prefer original src already applied; also unwrap SafeLinks and strip trackers."""
-    if not u:
-        return ""
-    u = u.strip()
-    # unwrap Office SafeLinks if no 'originalsrc' was captured
-    if is_safelink(u):
-        try:
-            q = parse_qs(urlparse(u).query)
-            inner = q.get("url", []) or q.get("URL", [])
-            if inner:
-                u = inner[0]
-        except Exception:
-            pass
-    u = strip_tracking(u)
-    # normalise scheme/host/path
-    try:
-        p = urlparse(u)
-        path = p.path.rstrip("/") or "/"
-        u = urlunparse((p.scheme.lower() or "https", p.netloc.lower(), path, "", p.query, ""))
-    except Exception:
-        pass
-    return u
+# Fixed namespace so item ids are reproducible across runs and machines
+ITEM_ID_NAMESPACE = uuid.UUID("6f1d3c2e-5b0a-4e8f-9a47-2c1e8d9b7a10")
+
+def stable_item_id(issue, link, title, theme=None) -> str:
+    """
+    Deterministic, content-derived item id (a UUIDv5 string):
+    newsletter number + canonical link + title slug. Items without a link use their theme
+    instead, mirroring the dedupe key in parse_file.
+    """
+    link = canonical_url(link or "")
+    key = "|".join([
+        str(issue),
+        link if link else "theme:" + (theme or "").strip().lower(),
+        slug_title(title),
+    ])
+    return str(uuid.uuid5(ITEM_ID_NAMESPACE, key))
 
 def slug_title(t: str) -> str:
     t = (t or "").strip().lower()
@@ -251,17 +262,89 @@ def iter_blocks(soup):
     collect(body)
     return queue
 
+# -----------------------------
+# BLOCK FEATURE TABLE
+# -----------------------------
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+TEXT_BLOCK_TAGS = ("p",) + HEADING_TAGS
+
+class Block(NamedTuple):
+    """Everything the parsers need to know about one block, computed once per document."""
+    el: object
+    name: str
+    text: str            # first_text(el); only filled for text blocks and theme/subtheme bars
+    bar: str | None      # "theme" (dark blue table), "subtheme" (grey table) or None
+    bold: bool
+    title: bool          # is_title_candidate(el)
+    href: str | None     # prefer_original_href() of the first <a>; None when there is no <a>
+    anchor_only: bool    # _is_anchor_only(el)
+    callout: bool        # text starts with a CALLOUT_PREFIXES phrase
+
+def _block_features(el):
+    name = el.name
+
+    if name == "table":
+        bg = get_bg_color(el)
+        bar = "theme" if bg in DARK_BLUE_BG else "subtheme" if bg in GREY_BG else None
+        # Only bars need their text; skip get_text on ordinary layout tables
+        text = first_text(el) if bar else ""
+        return Block(el, name, text, bar, False, False, None, False, False)
+
+    if name not in TEXT_BLOCK_TAGS:
+        return Block(el, name, "", None, False, False, None, False, False)
+
+    text = first_text(el)
+
+    # One walk over the subtree for both the anchors and any <b>/<strong>
+    anchors = []
+    has_bold_tag = False
+    for d in el.descendants:
+        n = d.name
+        if n == "a":
+            anchors.append(d)
+        elif n == "b" or n == "strong":
+            has_bold_tag = True
+
+    href = (prefer_original_href(anchors[0]) or "") if anchors else None
+    # Same rule as _is_anchor_only: text is already collapsed and trimmed
+    anchor_only = text.lower() in ANCHOR_ONLY_TOKENS
+    callout = bool(CALLOUT_PREFIXES.search(text)) if text else False
+    # Same rule as _is_visually_bold
+    style = (el.get("style") or "").lower()
+    bold = bool(
+        has_bold_tag
+        or ("font-weight" in style and ("bold" in style or re.search(r'font-weight\s*:\s*(6|7|8|9)\d{2}', style)))
+        or name in HEADING_TAGS
+    )
+
+    # Same checks, in the same order, as is_title_candidate
+    title = (
+        bold
+        and bool(text)
+        and len(text.split()) <= 28
+        and not callout
+        and not (anchors and len(" ".join(a.get_text(" ", strip=True) for a in anchors)) >= 0.8 * len(text))
+        and not anchor_only
+    )
+    return Block(el, name, text, None, bold, title, href, anchor_only, callout)
+
+def block_table(soup):
+    """Feature table for every block from iter_blocks, in document order."""
+    return [_block_features(el) for el in iter_blocks(soup)]
+
 # -----------------------------
 # FALLBACK PARSER (for issues like #86 / soft titles)
 # -----------------------------
-def fallback_parse_by_link(soup, newsletter_no, issue_date):
+def fallback_parse_by_link(soup, newsletter_no, issue_date, blocks=None):
     """
     Fallback for issues where item titles aren't clearly bold.
     Walk the blocks; when inside a theme (dark-blue table), collect <p> lines into items.
     First non-empty <p> becomes the title; close item when a link appears or a new bar appears.
+    Pass `blocks` (from block_table) to reuse the features already computed by parse_file.
     """
     rows = []
-    blocks = iter_blocks(soup)
+    if blocks is None:
+        blocks = block_table(soup)
 
     current_theme = None
     current_subtheme = None
@@ -275,7 +358,7 @@ def fallback_parse_by_link(soup, newsletter_no, issue_date):
         t = " ".join((title or "").split())
         if t and (desc_parts or link):
             rows.append({
-                "id": str(uuid.uuid4()),
+                "id": None,  # assigned after dedupe (stable_item_id)
                 "newsletter_number": newsletter_no,
                 "issue_date": issue_date,
                 "theme": current_theme,
@@ -286,30 +369,24 @@ def fallback_parse_by_link(soup, newsletter_no, issue_date):
             })
         title, desc_parts, link = None, [], None
 
-    for el in blocks:
-        if el.name == "table":
-            bg = get_bg_color(el)
-
-            # New theme/subtheme boundaries break the current item
-            if bg and (bg in DARK_BLUE_BG or bg in GREY_BG):
-                flush_item()
-
-            if bg and bg in DARK_BLUE_BG:
-                current_theme = first_text(el)
+    for b in blocks:
+        # New theme/subtheme boundaries break the current item
+        if b.bar:
+            flush_item()
+            if b.bar == "theme":
+                current_theme = b.text
                 current_subtheme = None
-                continue
-            elif bg and bg in GREY_BG:
-                current_subtheme = first_text(el)
-                continue
+            else:
+                current_subtheme = b.text
+            continue
 
-        if el.name == "p" and (current_theme or current_subtheme):
-            txt = first_text(el)
-            a = el.find("a")
-            href = canonical_url(prefer_original_href(a) or "") if a else ""
+        if b.name == "p" and (current_theme or current_subtheme):
+            txt = b.text
+            href = canonical_url(b.href) if b.href is not None else ""
 
-            if not title and txt and not CALLOUT_PREFIXES.search(txt) and not _is_anchor_only(el):
+            if not title and txt and not b.callout and not b.anchor_only:
                 title = txt
-            elif txt and not CALLOUT_PREFIXES.search(txt):
+            elif txt and not b.callout:
                 desc_parts.append(txt)
 
             if href and not link:
@@ -322,75 +399,70 @@ def fallback_parse_by_link(soup, newsletter_no, issue_date):
 # -----------------------------
 # MAIN PARSER
 # -----------------------------
-def parse_file(path):
-    html = open(path, "r", encoding="utf-8", errors="ignore").read()
-    soup = BeautifulSoup(html, "html.parser")
-
-    newsletter_no, issue_date = find_newsletter_number_and_date(soup)
+def parse_file(path, parser=None, metrics=None):
+    metrics = metrics or METRICS
+    with metrics.timer("read"):
+        html = open(path, "r", encoding="utf-8", errors="ignore").read()
+    with metrics.timer("soup_build"):
+        soup = make_soup(html, parser or HTML_PARSER)
+
+    with metrics.timer("number_date"):
+        newsletter_no, issue_date = find_newsletter_number_and_date(soup)
     current_theme = None
     current_subtheme = None
 
     rows = []
-    blocks = iter_blocks(soup)
+    with metrics.timer("block_table"):
+        blocks = block_table(soup)
+    t_walk = time.perf_counter()
     i = 0
     while i < len(blocks):
-        el = blocks[i]
+        b = blocks[i]
 
         # THEME / SUBTHEME via coloured tables
-        if el.name == "table":
-            bg = get_bg_color(el)
-            if bg and bg in DARK_BLUE_BG:
-                current_theme = first_text(el)
-                current_subtheme = None
-                i += 1
-                continue
-            elif bg and bg in GREY_BG:
-                current_subtheme = first_text(el)
-                i += 1
-                continue
+        if b.bar == "theme":
+            current_theme = b.text
+            current_subtheme = None
+            i += 1
+            continue
+        elif b.bar == "subtheme":
+            current_subtheme = b.text
+            i += 1
+            continue
 
         # NEWS ITEM: title (strict candidate), then description/link paragraphs
-        if el.name in ("p", "h1", "h2", "h3", "h4", "h5", "h6") and is_title_candidate(el) and (current_theme or current_subtheme):
-            title = first_text(el)
+        if b.title and (current_theme or current_subtheme):
+            title = b.text
 
             # Link from the title paragraph if present
             link = ""
-            a_in_title = el.find("a")
-            if a_in_title:
-                href = (prefer_original_href(a_in_title) or "").strip()
-                if href:
-                    link = canonical_url(href)
+            href = (b.href or "").strip()
+            if href:
+                link = canonical_url(href)
 
             desc_parts = []
             j = i + 1
             while j < len(blocks):
                 nxt = blocks[j]
 
-                if nxt.name == "table":
-                    bg = get_bg_color(nxt)
-                    if bg and (bg in DARK_BLUE_BG or bg in GREY_BG):
-                        break
-
-                # Stop at next title-like paragraph
-                if nxt.name in ("p", "h1", "h2", "h3", "h4", "h5", "h6") and is_title_candidate(nxt):
+                # Stop at the next theme/subtheme bar or title-like paragraph
+                if nxt.bar or nxt.title:
                     break
 
                 if nxt.name == "p":
-                    txt = first_text(nxt)
-                    if txt and not CALLOUT_PREFIXES.search(txt) and not _is_anchor_only(nxt):
+                    txt = nxt.text
+                    if txt and not nxt.callout and not nxt.anchor_only:
                         desc_parts.append(txt)
 
                     if not link:
-                        a = nxt.find("a")
-                        if a:
-                            href = (prefer_original_href(a) or "").strip()
-                            if href:
-                                link = canonical_url(href)
+                        href = (nxt.href or "").strip()
+                        if href:
+                            link = canonical_url(href)
                 j += 1
 
             description = " ".join(desc_parts).strip() or None
             rows.append({
-                "id": str(uuid.uuid4()),
+                "id": None,  # assigned after dedupe (stable_item_id)
                 "newsletter_number": newsletter_no,
                 "issue_date": issue_date,
                 "theme": current_theme,
@@ -404,8 +476,13 @@ def parse_file(path):
 
         i += 1
 
-    # Fallback for issues with non-bold titles (e.g., #50, #86)
-    extra = fallback_parse_by_link(soup, newsletter_no, issue_date)
+    metrics.add_time("block_walk", time.perf_counter() - t_walk)
+
+    # Fallback for issues with non-bold titles (e.g., #50, #86), sharing the same block table
+    with metrics.timer("fallback_parse"):
+        extra = fallback_parse_by_link(soup, newsletter_no, issue_date, blocks=blocks)
+    metrics.inc("fallback_candidates", len(extra))
+    t_dedupe = time.perf_counter()
 
     # -----------------------------
     # ROBUST MERGE & DEDUPE
@@ -441,40 +518,178 @@ def parse_file(path):
                 if not existing.get("description"):
                     existing["description"] = r.get("description")
                 # prefer better row’s other fields
-                for fld in ("id","newsletter_number","issue_date","theme","subtheme","title","link"):
+                for fld in ("newsletter_number","issue_date","theme","subtheme","title","link"):
                     existing[fld] = r.get(fld, existing.get(fld))
             else:
                 bucket[k] = r
 
     rows = list(bucket.values())
+
+    # Stable ids; fall back to the file name when the issue number could not be read
+    issue = newsletter_no if newsletter_no is not None else os.path.basename(path)
+    for r in rows:
+        r["id"] = stable_item_id(issue, r["link"], r["title"], r.get("theme"))
+    metrics.add_time("dedupe", time.perf_counter() - t_dedupe)
+    metrics.inc("items_parsed", len(rows))
     return rows
 
+# -----------------------------
+# BATCH PARSING
+# -----------------------------
+def _parse_file_safe(path, parser=None):
+    """
+    Worker entry point: never raises, so one bad file cannot abort the batch.
+    Also returns the file's own metrics snapshot, so worker-process timings reach the parent.
+    """
+    metrics = Metrics()
+    try:
+        rows, error = parse_file(path, parser, metrics), None
+    except Exception as e:
+        rows, error = [], f"{type(e).__name__}: {e}"
+        metrics.inc("parse_errors", labels={"error": type(e).__name__})
+    metrics.inc("files_parsed")
+    return path, rows, error, metrics.snapshot()
+
+def parse_files(files, workers=WORKERS, chunksize=CHUNKSIZE, parser=None):
+    """
+    Parse many newsletter files, in parallel when workers > 1.
+    Yields (path, rows, error) in the same order as `files`; error is None on success.
+    """
+    files = list(files)
+    parsers = [parser or HTML_PARSER] * len(files)
+    if workers <= 1 or len(files) <= 1:
+        results = map(_parse_file_safe, files, parsers)
+        for path, rows, error, snap in results:
+            METRICS.merge(snap)
+            yield path, rows, error
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        results = pool.map(_parse_file_safe, files, parsers, chunksize=max(1, chunksize))
+        for path, rows, error, snap in results:
+            METRICS.merge(snap)
+            yield path, rows, error
+
+# -----------------------------
+# INCREMENTAL INGESTION (manifest of file hashes)
+# -----------------------------
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_manifest(path=MANIFEST_JSON):
+    """{file name: {"sha256": ..., "ids": [...]}} from the last run, or {} if unusable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("parser_version") != PARSER_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+def save_manifest(files, path=MANIFEST_JSON):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"parser_version": PARSER_VERSION, "files": files}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def load_existing_rows(path=None):
+    """Rows of the previous output keyed by id, with missing values as None."""
+    path = path or with_format(OUTPUT_CSV, OUTPUT_FORMAT)
+    if not os.path.exists(path):
+        return {}
+    df = read_table(path, schema=ITEM_SCHEMA)
+    if list(df.columns) != OUTPUT_COLUMNS:
+        return {}
+    df = df.astype(object).where(df.notna(), None)
+    return {r["id"]: r for r in df.to_dict("records")}
+
 # -----------------------------
 # DRIVER
 # -----------------------------
 def main():
-    all_rows = []
+    with instrumented_run("extract00"):
+        _main()
+
+def _main():
     files = sorted(glob(os.path.join(FOLDER, "newsletter_*.html")))
     if not files:
         print("No newsletter_*.html files found. Check FOLDER path.")
         return
 
-    for fp in files:
-        try:
-            rows = parse_file(fp)
-            if not rows:
-                print(f"⚠️  No rows parsed from {os.path.basename(fp)}")
-            all_rows.extend(rows)
-        except Exception as e:
-            print(f"❌ Error parsing {os.path.basename(fp)}: {e}")
-
-    df = pd.DataFrame(all_rows, columns=[
-        "id", "newsletter_number", "issue_date",
-        "theme", "subtheme", "title", "description", "link"
-    ])
-    os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
-    df.to_csv(OUTPUT_CSV, index=False)
-    print(f"✅ Wrote {len(df)} rows to {OUTPUT_CSV}")
+    hashes = {os.path.basename(fp): file_sha256(fp) for fp in files}
+    manifest = load_manifest() if INCREMENTAL else {}
+    existing = load_existing_rows() if manifest else {}
+
+    # A file is reused only if its bytes are unchanged and all of its rows are still in the output
+    def reusable(name):
+        entry = manifest.get(name)
+        return bool(entry) and entry["sha256"] == hashes[name] and all(i in existing for i in entry["ids"])
+
+    to_parse = [fp for fp in files if not reusable(os.path.basename(fp))]
+    print(f"📰 {len(files)} newsletters: {len(files) - len(to_parse)} unchanged, {len(to_parse)} to parse")
+    METRICS.inc("files_reused", len(files) - len(to_parse))
+
+    # Walk files in order: changed ones take the next parse result (parse_files keeps file order),
+    # unchanged ones are spliced back from the previous output. Rows stream to the writer in batches.
+    results = parse_files(to_parse)
+    new_manifest = {}
+    output_path = with_format(OUTPUT_CSV, OUTPUT_FORMAT)
+    # Items also go to the shared SQLite store: reparsed files always, unchanged ones only if the
+    # store has not seen this version of the file yet (e.g. a fresh database)
+    db = PipelineDB(PIPELINE_DB) if PIPELINE_DB else None
+    db_hashes = db.newsletter_hashes() if db else {}
+    normaliser = TextNormaliser(ITEM_TEXT_COLUMNS) if NORMALISE_TEXT else None
+    orgs = load_classifier(ORGANISATION_RULES)
+
+    def tag(rows):
+        if orgs:
+            orgs.tag_rows(rows, (urlparse(r.get("link") or "").netloc for r in rows))
+        return rows
+
+    with RowWriter(output_path, columns=OUTPUT_COLUMNS, schema={**ITEM_SCHEMA, **ORG_SCHEMA}) as writer:
+        for fp in files:
+            name = os.path.basename(fp)
+            if not reusable(name):
+                _, rows, error = next(results)
+                if not error:
+                    if not rows:
+                        print(f"⚠️  No rows parsed from {name}")
+                    if normaliser:
+                        with METRICS.timer("normalise"):
+                            normaliser.normalise_rows(rows)
+                    writer.write_many(tag(rows))
+                    new_manifest[name] = {"sha256": hashes[name], "ids": [r["id"] for r in rows]}
+                    if db:
+                        db.replace_newsletter(name, hashes[name], rows)
+                    continue
+                print(f"❌ Error parsing {name}: {error}")
+
+            # Unchanged, or failed to reparse this time: keep what we had
+            if name in manifest and all(i in existing for i in manifest[name]["ids"]):
+                rows = tag([existing[i] for i in manifest[name]["ids"]])
+                writer.write_many(rows)
+                new_manifest[name] = manifest[name]
+                if db and db_hashes.get(name) != manifest[name]["sha256"]:
+                    db.replace_newsletter(name, manifest[name]["sha256"], rows)
+
+    save_manifest(new_manifest)
+    if normaliser:
+        normaliser.close()
+        print(f"🧽 Text normalisation: {normaliser.summary()}")
+    print(f"✅ Wrote {writer.rows_written} rows to {output_path}")
+    if db:
+        # Newsletters whose file was deleted or renamed since the store last saw them
+        pruned = db.prune_newsletters(hashes)
+        if pruned:
+            print(f"🗑️  Removed {pruned} items of newsletters no longer in {FOLDER}")
+        print(f"🗄️  Pipeline store {PIPELINE_DB}: {db.counts()['items']} items")
+        db.close()
 
 if __name__ == "__main__":
     main()
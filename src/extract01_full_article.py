@@ -1,24 +1,56 @@
 # Loads items_final_themes.csv (your fully cleaned dataset).
 # Removes blank links and canonicalises them using your shared helper.
-# Fetches each link using polite 1-second delays.
-# Handles failures cleanly (404, timeout, request errors).
+# Fetches links concurrently (thread pool) while keeping a polite 1-second gap per domain.
+# Overlaps downloading and parsing: fetch threads feed a bounded page queue drained by extraction processes.
+# Serves unchanged pages from an on-disk HTTP cache (ETag / Last-Modified revalidation).
+# Can record every response, or fetch from a local replay server for offline load tests (replay.py).
+# Reuses keep-alive connections per host and streams bodies, skipping PDFs and other non-HTML links.
+# Handles failures cleanly (404, timeout, request errors), retrying transient ones with backoff.
+# Re-scrape only what failed, e.g.: python src/extract01_full_article.py --organisation uk_government --failure-reason timeout
 # Extracts:
 # the page title
-# the main article text (article → main → largest section → body fallback)
+# the main article text (per-domain rule for the big sources, else article → main → largest section → body fallback)
+# Appends each finished article to a durable JSONL store, so interrupted runs resume where they stopped.
 # Saves a standalone article dataset.
 # Merges article results back into your newsletter items.
 
+import argparse
+import multiprocessing
 import os
+import queue
+import random
+import threading
 import time
 import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatch
+from typing import NamedTuple
 from urllib.parse import urlparse
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from bs4 import CData, NavigableString, Tag
+from requests.adapters import HTTPAdapter
 
-# ✅ Import canonical_url from your original scraper
-from extract00_newsletters import canonical_url
+from article_store import ArticleStore
+from content_sniff import SNIFF_BYTES, classify_content, detect_charset, reason_from_type
+from domain_rules import ALWAYS_DROP, DomainRule, rule_for
+from html_backend import make_soup
+from http_cache import HttpCache
+from metrics import METRICS, instrumented_run
+from near_dupes import load_clusters, representative_links
+from organisations import ORG_COLUMNS, ORG_RULES_CSV, ORG_SCHEMA, load_classifier
+from pipeline_db import PipelineDB
+from redirects import RedirectMap, collapse_links, equivalence_key, is_redirector
+from replay import Recordings, original_url, replay_url
+from row_writer import ARTICLE_SCHEMA, ITEM_SCHEMA, RowWriter, with_format
+from text_normalise import ARTICLE_TEXT_COLUMNS, TextNormaliser
+from text_store import TEXT_STORE_DIR, TextStore
+# ✅ Shared, memoised URL canonicalisation (also used by extract00_newsletters)
+from urls import UrlTable, canonicalise_many
 
 
 # -----------------------------
@@ -27,6 +59,90 @@ from extract00_newsletters import canonical_url
 NEWSLETTER_ITEMS_CSV = "/workspaces/ERP_Newsletter/data/data03_newsletter_items_clean/items_final_themes.csv"
 ARTICLES_CSV = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/newsletter_full_articles.csv"
 MERGED_OUTPUT_CSV = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/newsletter_full_articles_with_items.csv"
+# Incremental store: one JSON line per finished URL (+ a .runs.jsonl run journal beside it)
+ARTICLES_STORE = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/newsletter_full_articles.jsonl"
+# "csv" or "parquet" for ARTICLES_CSV / MERGED_OUTPUT_CSV (Parquet swaps the extension, needs pyarrow)
+OUTPUT_FORMAT = "csv"
+MERGE_CHUNK_ROWS = 1000  # items merged and written per batch
+# Near-duplicate clusters from near_dupes.py: a clustered item shares the representative's fetch
+# only when both links are the same page (same canonical or known final URL); syndicated copies and
+# reposts at different URLs are still fetched one by one. None (or a missing file) skips this.
+CLUSTERS_CSV = "/workspaces/ERP_Newsletter/data/data01_newsletter_items/newsletter_items_clusters.csv"
+# Shared SQLite store (pipeline_db.py): cleaned items, articles and every fetch attempt are upserted
+# there; its items_with_articles view is the merge as a query. None to skip.
+PIPELINE_DB = "/workspaces/ERP_Newsletter/data/pipeline.sqlite"
+# The merged CSV copies each article's text onto every item linking to it; kept for the notebooks,
+# set False to rely on the items_with_articles view instead.
+WRITE_MERGED_CSV = True
+# Normalise article title + text (mojibake, NFKC, whitespace) before they are stored; long texts
+# are chunked onto a process pool (text_normalise.py)
+NORMALISE_TEXT = True
+# Article texts are kept once per distinct text in a compressed, content-addressed store
+# (text_store.py); store rows carry only its text_ref, so re-scraping an unchanged page adds no
+# text. The articles table and the articles CSV carry the ref too (text_store.attach_text() or
+# PipelineDB.merged_frame(with_text=True) reads the texts back). None keeps texts inline everywhere.
+TEXT_STORE = TEXT_STORE_DIR
+# False: the merged CSV carries text_ref instead of a copy of the text per item
+# (text_store.attach_text() fills it back in when loading); True copies the text in as before
+MERGED_INLINE_TEXT = False
+
+ARTICLE_COLUMNS = list(ARTICLE_SCHEMA)
+# Items and articles are tagged with organisation / org_broad_category / org_category from the
+# maintained domain rules (organisations.py), by the host each link finally resolves to. The tags
+# replace any the input already carries. None to skip.
+ORGANISATION_RULES = ORG_RULES_CSV
+
+# Concurrency: global cap on in-flight requests, and a politeness gap per host
+MAX_WORKERS = 8
+# Extraction runs in its own process pool, fed by the fetch threads through a bounded queue of
+# raw pages, so downloads and parsing overlap. 0 extracts inline in the fetch threads.
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+EXTRACT_QUEUE_SIZE = 32            # pages waiting for extraction before fetchers block
+
+# HTML parser backend for article pages (see html_backend.py). Scraped pages are far messier
+# than the newsletter archive, so this stays on html.parser unless chosen explicitly.
+HTML_PARSER = "html.parser"
+PER_DOMAIN_DELAY = 1.0  # seconds between request starts to the same domain
+
+# Retries for transient failures (timeouts, 429 / 5xx, dropped connections): exponential backoff
+# with jitter, or the server's Retry-After when it sends one (and it is not absurdly long)
+MAX_RETRIES = 3
+BACKOFF_BASE = 2.0                 # seconds before the first retry, doubling each time
+BACKOFF_MAX = 60.0
+RETRY_AFTER_MAX = 300.0            # give up rather than wait longer than this
+TRANSIENT_REASONS = (
+    "timeout", "http_status_429", "http_status_5*",
+    "request_exception_ConnectionError", "request_exception_ChunkedEncodingError",
+)
+
+# On-disk response cache (set CACHE_DIR = None to disable)
+CACHE_DIR = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/http_cache"
+CACHE_TTL = 7 * 24 * 3600          # serve without revalidating for a week
+CACHE_MAX_BYTES = 2 * 1024**3      # LRU-evict beyond 2 GB
+OFFLINE_ONLY = False               # True: answer from the cache only, never touch the network
+
+CACHE = HttpCache(CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES) if CACHE_DIR else None
+
+# Connection pooling and body limits
+POOL_HOSTS = 32                    # hosts kept alive per fetch thread
+POOL_PER_HOST = 2                  # connections kept alive per host per thread
+MAX_BODY_BYTES = 10 * 1024**2      # give up on bodies beyond 10 MB ("too_large")
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Record / replay (see replay.py). RECORD_DIR saves every response fetch_html sees; REPLAY_URL
+# (e.g. "http://127.0.0.1:8765") sends requests to a local replay server instead of the web.
+RECORD_DIR = None
+REPLAY_URL = None
+
+RECORDINGS = Recordings(RECORD_DIR) if RECORD_DIR else None
+
+# Redirect resolution (redirects.py): each link's redirect chain and final URL, cached across runs,
+# so shorteners, tracking redirects and http/https/www variants of one page are fetched once.
+# Unresolved links are HEAD-requested before fetching. None to skip.
+REDIRECTS_JSON = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/redirects.json"
+HEAD_REJECTED = (403, 405, 501)    # servers that refuse HEAD: follow with a GET, body unread
+
+REDIRECTS = RedirectMap(REDIRECTS_JSON) if REDIRECTS_JSON else None
 
 HEADERS = {
     "User-Agent": (
@@ -40,10 +156,97 @@ HEADERS = {
 # -----------------------------
 # HTTP + HTML HELPERS
 # -----------------------------
-def fetch_html(url: str, timeout: int = 10) -> tuple[str | None, str | None]:
+_local = threading.local()
+
+
+def http_session() -> requests.Session:
+    """
+    This thread's requests.Session. Sessions keep connections alive per host, so repeat
+    requests to the same site skip the TCP + TLS handshake; one per fetch thread because
+    requests does not promise that a Session is thread-safe.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+
+def _record_fetch(domain: str, status: int, ttfb: float, total: float, nbytes: int) -> None:
+    """Time to response headers (incl. DNS / connect / TLS), body download time and bytes for one request."""
+    METRICS.add_time("fetch_ttfb", ttfb)
+    METRICS.add_time("fetch_download", total - ttfb)
+    METRICS.inc("bytes_downloaded", nbytes)
+    METRICS.inc("http_responses", labels={"status": status})
+    METRICS.observe("fetch_seconds", total, labels={"domain": domain})
+
+
+def _read_body(resp, max_bytes: int) -> tuple[bytes, str | None, int]:
+    """
+    Stream the response body, stopping early on non-HTML content or once it passes max_bytes.
+    Returns (body, None, size), or (bytes read before giving up, failure_reason, size) where the
+    bytes are at most the first chunk and size is the body's length as far as it is known.
+    """
+    content_type = resp.headers.get("Content-Type")
+    reason = reason_from_type(content_type)
+    if reason:
+        return b"", reason, 0
+    length = resp.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        return b"", "too_large", int(length)
+
+    chunks = []
+    size = 0
+    for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+        if not chunks:
+            reason = classify_content(content_type, chunk[:SNIFF_BYTES])
+            if reason:
+                return chunk, reason, len(chunk)
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            return chunks[0], "too_large", size
+    return b"".join(chunks), None, size
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date), else None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def last_retry_after() -> float | None:
+    """Retry-After (seconds) from this thread's most recent fetch_html call, if the server sent one."""
+    return getattr(_local, "retry_after", None)
+
+
+def fetch_html(url: str, timeout: int = 10, max_bytes: int | None = None,
+               limiter: "DomainRateLimiter | None" = None) -> tuple[str | None, str | None]:
     """
     Fetch raw HTML for a URL, with a reason if it fails.
 
+    Goes through CACHE when configured: fresh entries are returned without a request,
+    stale ones are revalidated with If-None-Match / If-Modified-Since (a 304 reuses the
+    stored body), and successful responses are written back. With OFFLINE_ONLY the
+    network is never used and a missing entry fails with "offline_cache_miss".
+
+    Requests go through a pooled keep-alive session and the body is streamed: PDFs, images
+    and other non-HTML responses are recognised from the headers / first bytes and abandoned
+    ("non_html_pdf", ...), and bodies over `max_bytes` (default MAX_BODY_BYTES) fail as "too_large".
+
+    With a `limiter`, the domain's politeness slot is taken just before the request goes out, so
+    pages answered from the cache (or offline) never wait for one.
+
     Returns
     -------
     html : str | None
@@ -51,22 +254,72 @@ def fetch_html(url: str, timeout: int = 10) -> tuple[str | None, str | None]:
     failure_reason : str | None
         A short machine-readable reason if it failed, else None.
     """
+    _local.retry_after = None
+    cached = CACHE.get(url) if CACHE else None
+    if cached and (OFFLINE_ONLY or CACHE.is_fresh(cached)):
+        METRICS.inc("cache_requests", labels={"result": "hit"})
+        return cached.text, None
+    if OFFLINE_ONLY:
+        METRICS.inc("cache_requests", labels={"result": "miss"})
+        reason = "offline_cache_miss"
+        print(f"❌ {reason} for {url}")
+        return None, reason
+
+    headers = dict(HEADERS)
+    if cached:
+        headers.update(cached.validators())
+
+    if CACHE:
+        METRICS.inc("cache_requests", labels={"result": "stale" if cached else "miss"})
+
+    domain = urlparse(url).netloc
+    if limiter:
+        limiter.wait(domain)
+    t0 = time.perf_counter()
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
-        if resp.status_code != 200:
-            reason = f"http_status_{resp.status_code}"
+        request_url = replay_url(REPLAY_URL, url) if REPLAY_URL else url
+        with http_session().get(request_url, headers=headers, timeout=timeout, stream=True) as resp:
+            ttfb = time.perf_counter() - t0
+            if resp.status_code in (429, 503):
+                _local.retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if resp.status_code == 200:
+                body, reason, size = _read_body(resp, max_bytes or MAX_BODY_BYTES)
+            else:
+                # Error bodies are only kept when recording
+                body, reason = resp.content if RECORDINGS else b"", f"http_status_{resp.status_code}"
+                size = len(body)
+        _record_fetch(domain, resp.status_code, ttfb, time.perf_counter() - t0, size)
+        if RECORDINGS:
+            # Rejected bodies are recorded as the part that was read plus their full size, so the
+            # replay fails the same check for the same reason
+            RECORDINGS.record(url, resp, body, failure_reason=reason,
+                              body_size=size if resp.status_code == 200 and reason else None)
+
+        if resp.status_code == 304 and cached:
+            METRICS.inc("cache_requests", labels={"result": "revalidated"})
+            CACHE.revalidated(cached, resp.headers)
+            return cached.text, None
+
+        if reason:
             print(f"❌ {reason} fetching {url}")
             return None, reason
 
-        resp.encoding = resp.apparent_encoding
-        return resp.text, None
+        encoding = detect_charset(resp.headers.get("Content-Type"), body)
+        if CACHE:
+            CACHE.put(url, resp.status_code, original_url(resp.url), resp.headers, body, encoding)
+        if REDIRECTS and resp.history:
+            REDIRECTS.record(url, original_url(resp.url), [original_url(h.url) for h in resp.history],
+                             resp.status_code)
+        return body.decode(encoding, errors="replace"), None
 
     except requests.exceptions.Timeout:
+        METRICS.observe("fetch_seconds", time.perf_counter() - t0, labels={"domain": domain})
         reason = "timeout"
         print(f"❌ {reason} fetching {url}")
         return None, reason
 
     except requests.exceptions.RequestException as e:
+        METRICS.observe("fetch_seconds", time.perf_counter() - t0, labels={"domain": domain})
         reason = f"request_exception_{type(e).__name__}"
         print(f"❌ {reason} fetching {url}: {e}")
         return None, reason
@@ -77,14 +330,111 @@ def fetch_html(url: str, timeout: int = 10) -> tuple[str | None, str | None]:
         return None, reason
 
 
-def extract_main_text(html: str) -> str | None:
+class ExtractedArticle(NamedTuple):
+    title: str | None
+    text: str | None
+    container: Tag | None  # element the text came from (<article>, best container or <body>)
+    rule: str | None = None  # domain rule that produced it (domain_rules.py), None for the generic heuristic
+
+
+MIN_MAIN_WORDS = 50
+CONTAINER_TAGS = ("main", "div", "section")
+
+
+def _text_lengths(root) -> dict[int, int]:
+    """
+    Length of `el.get_text(" ", strip=True)` for every tag under `root`, keyed by id(tag),
+    computed in one bottom-up pass over the tree instead of one get_text call per tag.
+
+    get_text(" ", strip=True) joins the non-empty stripped strings with single spaces,
+    so its length is (sum of stripped string lengths) + (number of strings - 1).
+    """
+    chars = {}
+    count = {}
+    # Reversed document order visits every child before its parent
+    for node in reversed(list(root.descendants)):
+        parent_id = id(node.parent)
+        if isinstance(node, Tag):
+            nid = id(node)
+            c, n = chars.get(nid, 0), count.get(nid, 0)
+            if n:
+                chars[parent_id] = chars.get(parent_id, 0) + c
+                count[parent_id] = count.get(parent_id, 0) + n
+        elif type(node) in (NavigableString, CData):
+            stripped = node.strip()
+            if stripped:
+                chars[parent_id] = chars.get(parent_id, 0) + len(stripped)
+                count[parent_id] = count.get(parent_id, 0) + 1
+    return {nid: chars[nid] + n - 1 for nid, n in count.items()}
+
+
+def _title_from_soup(soup) -> str | None:
+    # <title> tag
+    if soup.title and soup.title.string:
+        t = " ".join(soup.title.string.split())
+        if t:
+            return t
+    # Or an <h1>
+    h1 = soup.find("h1")
+    if h1:
+        t = " ".join(h1.get_text(" ", strip=True).split())
+        if t:
+            return t
+    return None
+
+
+def _extract_with_rule(soup, rule: DomainRule) -> tuple[ExtractedArticle | None, bool]:
+    """
+    Targeted path for a site with a domain rule: first matching content selector, minus the
+    rule's boilerplate. Returns (article or None, whether the tree was pruned).
     """
-    Very simple heuristic to get main article text:
+    container = next(filter(None, (soup.select_one(sel) for sel in rule.content)), None)
+    if container is None:
+        return None, False
+
+    title = None
+    for sel in rule.title:
+        el = soup.select_one(sel)
+        if el is not None:
+            title = " ".join(el.get_text(" ", strip=True).split()) or None
+            if title:
+                break
+
+    for tag in container.select(", ".join(ALWAYS_DROP + rule.drop)):
+        tag.decompose()
+    words = container.get_text(" ", strip=True).split()
+    if len(words) <= MIN_MAIN_WORDS:
+        return None, True
+    return ExtractedArticle(title or _title_from_soup(soup), " ".join(words), container, rule.name), True
+
+
+def extract_article(html: str, parser: str | None = None, domain: str | None = None) -> ExtractedArticle:
+    """
+    Parse a page once and return its title, main text and the container the text came from.
+
+    If `domain` has a rule in domain_rules.py, its selectors are tried first; when they find
+    no container or too little text the page goes through the generic heuristic:
     - Prefer <article> tag if present and long enough
     - Else pick the largest <main>/<div>/<section> by text length
     - Else fall back to body text
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, parser or HTML_PARSER)
+
+    rule = rule_for(domain) if domain else None
+    if rule:
+        article, pruned = _extract_with_rule(soup, rule)
+        METRICS.inc("domain_rule", labels={
+            "rule": rule.name,
+            "result": "hit" if article else ("too_short" if pruned else "no_container"),
+        })
+        if article:
+            return article
+        if pruned:
+            # The generic heuristic must see the page as served
+            soup = make_soup(html, parser or HTML_PARSER)
+
+    # Title first, from the untouched tree
+    title = _title_from_soup(soup)
 
     # Strip scripts/styles
     for tag in soup(["script", "style", "noscript"]):
@@ -93,49 +443,479 @@ def extract_main_text(html: str) -> str | None:
     # 1) Prefer <article>
     article_tag = soup.find("article")
     if article_tag:
-        text = article_tag.get_text(" ", strip=True)
-        if len(text.split()) > 50:
-            return " ".join(text.split())
+        words = article_tag.get_text(" ", strip=True).split()
+        if len(words) > MIN_MAIN_WORDS:
+            return ExtractedArticle(title, " ".join(words), article_tag)
 
-    # 2) Largest candidate container
-    candidates = soup.find_all(["main", "div", "section"])
-    best_text = ""
-    for c in candidates:
-        t = c.get_text(" ", strip=True)
-        if len(t) > len(best_text):
-            best_text = t
+    # 2) Largest candidate container (first one wins ties, in document order)
+    lengths = _text_lengths(soup)
+    best, best_len = None, 0
+    for c in soup.find_all(CONTAINER_TAGS):
+        n = lengths.get(id(c), 0)
+        if n > best_len:
+            best, best_len = c, n
 
-    if len(best_text.split()) > 50:
-        return " ".join(best_text.split())
+    if best is not None:
+        words = best.get_text(" ", strip=True).split()
+        if len(words) > MIN_MAIN_WORDS:
+            return ExtractedArticle(title, " ".join(words), best)
 
     # 3) Fallback: whole body
     body = soup.body or soup
-    text = body.get_text(" ", strip=True)
-    text = " ".join(text.split())
-    return text if text else None
+    text = " ".join(body.get_text(" ", strip=True).split())
+    return ExtractedArticle(title, text or None, body)
 
 
-def article_title_from_html(html: str) -> str | None:
+def extract_main_text(html: str, parser: str | None = None) -> str | None:
+    """Main article text only (see extract_article)."""
+    return extract_article(html, parser).text
+
+
+def article_title_from_html(html: str, parser: str | None = None) -> str | None:
     """Try to extract a reasonable article title."""
-    soup = BeautifulSoup(html, "html.parser")
-    # <title> tag
-    if soup.title and soup.title.string:
-        t = " ".join(soup.title.string.split())
-        if t:
-            return t
-    # Or an <h1>
-    h1 = soup.find("h1")
-    if h1:
-        t = " ".join(h1.get_text(" ", strip=True).split())
-        if t:
-            return t
-    return None
+    return _title_from_soup(make_soup(html, parser or HTML_PARSER))
+
+
+# -----------------------------
+# CONCURRENT FETCHING
+# -----------------------------
+class DomainRateLimiter:
+    """
+    Hand out request start times so each domain is hit at most once per `delay` seconds.
+    Different domains never wait on each other. Thread-safe.
+    """
+
+    def __init__(self, delay: float = PER_DOMAIN_DELAY):
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, domain: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = slot + self.delay
+        pause = slot - now
+        if pause > 0:
+            time.sleep(pause)
+
+    def defer(self, domain: str, seconds: float) -> None:
+        """Hold back every request to `domain` for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._next_slot[domain] = max(self._next_slot.get(domain, now), now + seconds)
+
+
+def interleave_by_domain(links) -> list[str]:
+    """
+    Reorder links round-robin across domains (gov.uk, schoolsweek, gov.uk, ...) so that
+    workers spread over many hosts instead of queueing behind one busy domain.
+    """
+    queues = defaultdict(deque)
+    for url in links:
+        queues[urlparse(url).netloc].append(url)
+
+    ordered = []
+    while queues:
+        for domain in list(queues):
+            ordered.append(queues[domain].popleft())
+            if not queues[domain]:
+                del queues[domain]
+    return ordered
+
+
+def is_transient(reason: str | None) -> bool:
+    return bool(reason) and any(fnmatch(reason, pattern) for pattern in TRANSIENT_REASONS)
+
+
+def retry_delay(attempt: int, retry_after: float | None = None) -> float | None:
+    """
+    Seconds to wait before retry number `attempt` (1-based): exponential backoff with full
+    jitter, but never sooner than the server's Retry-After. None means do not retry.
+    """
+    if attempt > MAX_RETRIES:
+        return None
+    if retry_after is not None and retry_after > RETRY_AFTER_MAX:
+        return None
+    delay = random.uniform(0.5, 1.0) * min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1))
+    return max(delay, retry_after or 0.0)
+
+
+def fetch_with_retries(url: str, limiter: DomainRateLimiter | None = None) -> tuple[str | None, str | None]:
+    """
+    fetch_html, retrying transient failures per retry_delay(). While waiting, the whole domain is
+    held back through `limiter`, so other workers do not keep hitting a host that asked us to slow down.
+    """
+    domain = urlparse(url).netloc
+    attempt = 0
+    while True:
+        html, reason = fetch_html(url, limiter=limiter)
+        if html or not is_transient(reason):
+            return html, reason
+        attempt += 1
+        delay = retry_delay(attempt, last_retry_after())
+        if delay is None:
+            METRICS.inc("retries_exhausted", labels={"failure_reason": reason})
+            return html, reason
+        METRICS.inc("retries", labels={"failure_reason": reason})
+        print(f"🔁 retry {attempt}/{MAX_RETRIES} in {delay:.1f}s after {reason}: {url}")
+        if limiter:
+            limiter.defer(domain, delay)  # the next fetch_html waits out the deferred slot
+        else:
+            time.sleep(delay)
+
+
+def _error_row(url: str, reason: str | None) -> dict:
+    """Article row for a page we could not fetch (or could not parse)."""
+    return {
+        "article_id": str(uuid.uuid4()),
+        "link_canonical": url,
+        "domain": urlparse(url).netloc if url else "",
+        "article_title": None,
+        "article_text": None,
+        "status": "error",
+        "failure_reason": reason,  # e.g. "http_status_404", "timeout"
+    }
+
+
+def article_row(url: str, html: str, parser: str | None = None) -> dict:
+    """Extract a fetched page into an article row (ok / empty)."""
+    domain = urlparse(url).netloc
+    t0 = time.perf_counter()
+    a_title, a_text, _, a_rule = extract_article(html, parser=parser, domain=domain)
+    elapsed = time.perf_counter() - t0
+    METRICS.add_time("extraction", elapsed)
+    METRICS.add_time("extraction_rule" if a_rule else "extraction_generic", elapsed)
+
+    if a_text:
+        status = "ok"
+        failure_reason = None
+    else:
+        status = "empty"
+        failure_reason = "no_main_text_extracted_or_too_short"
+
+    return {
+        "article_id": str(uuid.uuid4()),
+        "link_canonical": url,
+        "domain": domain,
+        "article_title": a_title,
+        "article_text": a_text,
+        "status": status,
+        "failure_reason": failure_reason,
+    }
+
+
+def scrape_article(url: str, limiter: DomainRateLimiter | None = None) -> dict:
+    """Fetch one canonical URL (with retries) and turn it into an article row (ok / empty / error)."""
+    html, fetch_reason = fetch_with_retries(url, limiter)
+    if not html:
+        # We couldn't fetch the page at all
+        return _error_row(url, fetch_reason)
+    return article_row(url, html)
+
+
+def _extract_row_safe(url: str, html: str, parser: str | None = None) -> tuple[dict, dict]:
+    """
+    Extraction worker entry point (runs in a worker process): never raises, so one pathological
+    page cannot take the pipeline down. Returns the row and the worker's metrics for this page.
+    """
+    METRICS.reset()
+    try:
+        row = article_row(url, html, parser)
+    except Exception as e:
+        print(f"❌ extraction failed for {url}: {type(e).__name__}: {e}")
+        row = _error_row(url, f"extraction_failed_{type(e).__name__}")
+    return row, METRICS.snapshot()
+
+
+class PipelineStats:
+    """Per-stage counts and busy time for the fetch -> queue -> extract pipeline. Thread-safe."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.started = time.perf_counter()
+        self.fetched = 0              # pages downloaded (HTML handed to the queue)
+        self.fetch_failed = 0         # links that produced no page
+        self.fetch_seconds = 0.0      # summed over fetch threads, including politeness waits
+        self.blocked_seconds = 0.0    # fetch threads waiting on a full queue (backpressure)
+        self.extracted = 0
+        self.extract_seconds = 0.0    # summed over extraction processes
+        self.queue_peak = 0
+        self._lock = threading.Lock()
+
+    def add(self, **values) -> None:
+        with self._lock:
+            for k, v in values.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def saw_depth(self, depth: int) -> None:
+        with self._lock:
+            self.queue_peak = max(self.queue_peak, depth)
+
+    def report(self, fetch_workers: int, extract_workers: int) -> str:
+        wall = time.perf_counter() - self.started
+        pages = self.fetched + self.fetch_failed
+        return (
+            f"📈 Pipeline in {wall:.1f}s wall | fetch: {pages} links ({self.fetch_failed} failed), "
+            f"{self.fetch_seconds:.1f}s busy over {fetch_workers} threads, {pages / wall if wall else 0:.1f}/s | "
+            f"extract: {self.extracted} pages, {self.extract_seconds:.1f}s CPU over {extract_workers} processes, "
+            f"{self.extracted / wall if wall else 0:.1f}/s | queue peak {self.queue_peak}/{self.queue_size}, "
+            f"fetchers blocked {self.blocked_seconds:.1f}s"
+        )
+
+
+def scrape_articles(links, max_workers: int = MAX_WORKERS,
+                    per_domain_delay: float = PER_DOMAIN_DELAY, on_row=None,
+                    collect: bool = True, extract_workers: int = EXTRACT_WORKERS,
+                    queue_size: int = EXTRACT_QUEUE_SIZE) -> list[dict]:
+    """
+    Scrape many links in parallel. At most `max_workers` requests are in flight, and
+    each domain still gets at most one request per `per_domain_delay` seconds.
+
+    With extract_workers > 0 fetching and extraction overlap: fetch threads push raw HTML into
+    a queue of at most `queue_size` pages (a full queue blocks them, so memory stays bounded)
+    and a pool of `extract_workers` processes turns pages into rows. With extract_workers = 0
+    each fetch thread extracts its own page.
+
+    `on_row(row)` is called as soon as each URL finishes (from a fetch thread, or the one writer
+    thread that collects extraction results). Rows come back in the same order as `links`; with
+    collect=False they are only handed to `on_row` and an empty list is returned.
+    """
+    links = list(links)
+    limiter = DomainRateLimiter(per_domain_delay)
+    total = len(links)
+    done = 0
+    done_lock = threading.Lock()
+    by_url = {}
+    stats = PipelineStats(queue_size)
+
+    def emit(url, row):
+        nonlocal done
+        if on_row:
+            on_row(row)
+        with done_lock:
+            done += 1
+            if collect:
+                by_url[url] = row
+            print(f"[{done}/{total}] {row['status']:<5} {url}")
+
+    order = interleave_by_domain(links)
+    if extract_workers <= 0:
+        def work(url):
+            emit(url, scrape_article(url, limiter))
+
+        _run_fetchers(work, order, max_workers)
+        return [by_url[url] for url in links] if collect else []
+
+    pages = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def fetch(url):
+        t0 = time.perf_counter()
+        html, fetch_reason = fetch_with_retries(url, limiter)
+        t1 = time.perf_counter()
+        if not html:
+            stats.add(fetch_failed=1, fetch_seconds=t1 - t0)
+            emit(url, _error_row(url, fetch_reason))
+            return
+        stats.add(fetched=1, fetch_seconds=t1 - t0)
+        pages.put((url, html))
+        stats.add(blocked_seconds=time.perf_counter() - t1)
+        stats.saw_depth(pages.qsize())
+
+    results = queue.Queue()
+
+    def collect_results():
+        # Writer: rows go to on_row (normalise, text store, article store, SQLite) on this thread,
+        # not on the pool's done-callbacks, which run on the executor's management thread
+        while True:
+            item = results.get()
+            if item is None:
+                return
+            url, future = item
+            try:
+                row, snap = future.result()
+            except BaseException as e:  # worker died (BrokenProcessPool) or the run was cancelled
+                row, snap = _error_row(url, f"extraction_failed_{type(e).__name__}"), None
+            if snap:
+                METRICS.merge(snap)
+                stats.add(extracted=1, extract_seconds=snap["stages"].get("extraction", {}).get("seconds", 0.0))
+            try:
+                emit(url, row)
+            finally:
+                slots.release()  # a slow writer holds back dispatch, so finished rows stay bounded
+
+    def dispatch(procs):
+        # Consumer: move pages from the queue to the process pool, a few in flight per process
+        while True:
+            item = pages.get()
+            if item is None:
+                return
+            if stop.is_set():
+                continue  # interrupted: drain the queue so blocked fetchers can finish
+            slots.acquire()
+            url, html = item
+            try:
+                future = procs.submit(_extract_row_safe, url, html, HTML_PARSER)
+            except Exception as e:  # pool broken or shut down: keep draining so fetchers never block
+                slots.release()
+                emit(url, _error_row(url, f"extraction_failed_{type(e).__name__}"))
+                continue
+            future.add_done_callback(lambda f, url=url: results.put((url, f)))
+
+    # Processes are spawned, not forked: fork is unsafe once fetch threads hold locks
+    slots = threading.Semaphore(2 * extract_workers)
+    procs = ProcessPoolExecutor(max_workers=extract_workers,
+                                mp_context=multiprocessing.get_context("spawn"))
+    consumer = threading.Thread(target=dispatch, args=(procs,), name="extract-dispatch", daemon=True)
+    writer = threading.Thread(target=collect_results, name="extract-results", daemon=True)
+    consumer.start()
+    writer.start()
+    try:
+        _run_fetchers(fetch, order, max_workers)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        pages.put(None)
+        consumer.join()
+        procs.shutdown(wait=not stop.is_set(), cancel_futures=stop.is_set())
+        results.put(None)  # after shutdown: every future's callback has queued its result
+        writer.join()
+
+    print(stats.report(max_workers, extract_workers))
+    METRICS.add_time("fetch_stage", stats.fetch_seconds, calls=stats.fetched + stats.fetch_failed)
+    METRICS.add_time("queue_blocked", stats.blocked_seconds, calls=stats.fetched)
+    return [by_url[url] for url in links] if collect else []
+
+
+def _run_fetchers(work, urls, max_workers: int) -> None:
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for _ in pool.map(work, urls):
+            pass
+    except BaseException:
+        # Ctrl-C / crash: drop queued URLs instead of draining the whole backlog
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+# -----------------------------
+# REDIRECT RESOLUTION
+# -----------------------------
+def final_host(link: str) -> str:
+    """Host `link` ends up on: its final URL's when REDIRECTS has resolved it, else its own."""
+    return urlparse(REDIRECTS.final_url(link) if REDIRECTS else link).netloc
+
+
+def resolve_redirects(url: str, timeout: int = 10) -> tuple[str | None, list[str], int | None]:
+    """
+    Follow `url`'s redirects without downloading the page: a HEAD request, or a streamed GET whose
+    body is never read when the server refuses HEAD. Returns (final url, hop urls, final status);
+    the final url is None when the request failed.
+    """
+    request_url = replay_url(REPLAY_URL, url) if REPLAY_URL else url
+    session = http_session()
+    try:
+        resp = session.head(request_url, headers=HEADERS, timeout=timeout, allow_redirects=True)
+        if resp.status_code in HEAD_REJECTED:
+            with session.get(request_url, headers=HEADERS, timeout=timeout, stream=True) as resp:
+                pass
+    except requests.exceptions.RequestException:
+        return None, [], None
+    return original_url(resp.url), [original_url(h.url) for h in resp.history], resp.status_code
+
+
+def resolve_links(links, redirect_map: RedirectMap, max_workers: int = MAX_WORKERS,
+                  per_domain_delay: float = PER_DOMAIN_DELAY, network: bool = True) -> dict:
+    """
+    Bring `redirect_map` up to date for `links`: links resolved recently are kept, links in the
+    HTTP cache take the final URL recorded there, and links on shortener / tracking hosts
+    (is_redirector) are resolved over the network (politely, per domain) unless network=False.
+    Any other link is left to its fetch, which records the redirects it follows. Returns counts per source.
+    """
+    counts = defaultdict(int)
+    todo = []
+    for link in links:
+        if redirect_map.is_fresh(link):
+            counts["known"] += 1
+            continue
+        final = CACHE.final_url(link) if CACHE else None
+        if final:
+            redirect_map.record(link, final)
+            counts["cache"] += 1
+        elif is_redirector(link):
+            todo.append(link)
+        else:
+            counts["on_fetch"] += 1
+    if not network:
+        counts["unresolved"] = len(todo)
+        return dict(counts)
+
+    limiter = DomainRateLimiter(per_domain_delay)
+    counts_lock = threading.Lock()
+
+    def work(link):
+        limiter.wait(urlparse(link).netloc)
+        final, hops, status = resolve_redirects(link)
+        redirect_map.record(link, final, hops, status)
+        with counts_lock:
+            counts["failed" if final is None else ("redirected" if hops else "direct")] += 1
+
+    _run_fetchers(work, interleave_by_domain(todo), max_workers)
+    return dict(counts)
+
+
+# -----------------------------
+# RE-SCRAPE SELECTION
+# -----------------------------
+def select_for_rescrape(latest: dict, organisation_of: dict | None = None, organisations=(),
+                        domains=(), failure_reasons=()) -> list[str]:
+    """
+    Links whose latest stored attempt was not "ok" and that match every filter given:
+    organisation (from the items table), domain (host or any parent, "gov.uk" covers
+    "www.gov.uk") and failure_reason (glob patterns such as "http_status_5*").
+    """
+    organisation_of = organisation_of or {}
+    selected = []
+    for url, row in latest.items():
+        if row.get("status") == "ok":
+            continue
+        if organisations and organisation_of.get(url) not in organisations:
+            continue
+        host = (row.get("domain") or urlparse(url).netloc).lower()
+        if domains and not any(host == d or host.endswith("." + d) for d in domains):
+            continue
+        reason = row.get("failure_reason") or ""
+        if failure_reasons and not any(fnmatch(reason, p) for p in failure_reasons):
+            continue
+        selected.append(url)
+    return selected
 
 
 # -----------------------------
 # MAIN
 # -----------------------------
-def main():
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Scrape full articles for the newsletter items.")
+    ap.add_argument("--organisation", action="append", default=[],
+                    help="re-scrape only failed links of this organisation (repeatable)")
+    ap.add_argument("--domain", action="append", default=[], help="re-scrape only failed links on this domain")
+    ap.add_argument("--failure-reason", action="append", default=[],
+                    help="re-scrape only links that failed with this reason (glob, e.g. 'http_status_5*')")
+    ap.add_argument("--dry-run", action="store_true", help="show what a re-scrape would fetch and stop")
+    args = ap.parse_args(argv)
+
+    rescrape = None
+    if args.organisation or args.domain or args.failure_reason:
+        rescrape = {"organisations": set(args.organisation), "domains": [d.lower() for d in args.domain],
+                    "failure_reasons": args.failure_reason}
+    with instrumented_run("extract01"):
+        _main(rescrape, dry_run=args.dry_run)
+
+
+def _main(rescrape: dict | None = None, dry_run: bool = False):
     if not os.path.exists(NEWSLETTER_ITEMS_CSV):
         raise FileNotFoundError(f"Newsletter items CSV not found: {NEWSLETTER_ITEMS_CSV}")
 
@@ -149,70 +929,182 @@ def main():
     df["link"] = df["link"].astype(str).str.strip()
     df = df[df["link"] != ""]
 
-    # Canonicalise links using your shared canonical_url function
-    df["link_canonical"] = df["link"].apply(canonical_url)
+    # Canonicalise links using the shared canonical_url, once per unique link
+    df["link_canonical"] = canonicalise_many(df["link"])
     df = df[df["link_canonical"] != ""]
-    links = df["link_canonical"].dropna().unique()
 
-    print(f"🔗 Unique links to fetch: {len(links)}")
+    # Near-duplicates: a cluster shares its representative's fetch only where the links are the
+    # same page (same canonical or known final URL); text-similar items on other pages keep their own
+    df["fetch_canonical"] = df["link_canonical"]
+    clusters = load_clusters(CLUSTERS_CSV) if CLUSTERS_CSV else None
+    if clusters is not None and "id" in df.columns:
+        def same_page(url):
+            return equivalence_key(REDIRECTS.final_url(url) if REDIRECTS else url)
 
-    rows = []
-    for i, url in enumerate(links, start=1):
-        print(f"[{i}/{len(links)}] Fetching {url}")
-        html, fetch_reason = fetch_html(url)
+        df["fetch_canonical"] = representative_links(df, clusters, page_key=same_page)
+        unchecked = representative_links(df, clusters, page_key=None)
+        shared = df["link_canonical"].nunique() - df["fetch_canonical"].nunique()
+        kept = int(((unchecked != df["link_canonical"]) & (df["fetch_canonical"] == df["link_canonical"])).sum())
+        print(f"🧬 {shared} links covered by a near-duplicate's article; "
+              f"{kept} clustered items link elsewhere and are fetched separately")
 
-        if not html:
-            # We couldn't fetch the page at all
-            rows.append({
-                "article_id": str(uuid.uuid4()),
-                "link_canonical": url,
-                "domain": urlparse(url).netloc if url else "",
-                "article_title": None,
-                "article_text": None,
-                "status": "error",
-                "failure_reason": fetch_reason,  # e.g. "http_status_404", "timeout"
-            })
-            continue
+    # Resume: skip links that already have an "ok" row in the store
+    store = ArticleStore(ARTICLES_STORE)
+    done = store.completed()
 
-        a_title = article_title_from_html(html)
-        a_text = extract_main_text(html)
+    # Redirects: links that land on the same page share one fetch (an already fetched link wins)
+    if REDIRECTS is not None:
+        unique = df["fetch_canonical"].dropna().unique()
+        resolved = resolve_links(unique, REDIRECTS, network=not (OFFLINE_ONLY or dry_run))
+        REDIRECTS.save()
+        rep = collapse_links(unique, REDIRECTS, prefer=done)
+        df["fetch_canonical"] = df["fetch_canonical"].map(rep)
+        collapsed = len(unique) - df["fetch_canonical"].nunique()
+        print(f"↪️  Redirects: {', '.join(f'{k} {v}' for k, v in sorted(resolved.items()))}; "
+              f"{collapsed} links collapse onto an equivalent link")
+    links = df["fetch_canonical"].dropna().unique()
 
-        if a_text:
-            status = "ok"
-            failure_reason = None
-        else:
-            status = "empty"
-            failure_reason = "no_main_text_extracted_or_too_short"
-
-        rows.append({
-            "article_id": str(uuid.uuid4()),
-            "link_canonical": url,
-            "domain": urlparse(url).netloc if url else "",
-            "article_title": a_title,
-            "article_text": a_text,
-            "status": status,
-            "failure_reason": failure_reason,
-        })
+    orgs = load_classifier(ORGANISATION_RULES)
+    if orgs:
+        df = orgs.tag_frame(df, df["link_canonical"].map({u: final_host(u) for u in df["link_canonical"].unique()}))
+        print(f"🏷️  Organisations: {df['organisation'].notna().sum()}/{len(df)} items matched "
+              f"({df['organisation'].nunique()} organisations)")
+    pending = [url for url in links if url not in done]
 
-        # Be polite to servers
-        time.sleep(1)
-
-    # Save articles table
-    articles_df = pd.DataFrame(rows)
-    os.makedirs(os.path.dirname(ARTICLES_CSV), exist_ok=True)
-    articles_df.to_csv(ARTICLES_CSV, index=False)
-    print(f"✅ Wrote {len(articles_df)} article rows to {ARTICLES_CSV}")
-
-    # Merge back onto newsletter items
-    merged = df.merge(
-        articles_df,
-        on="link_canonical",
-        how="left",
-        validate="many_to_one",
+    print(f"🔗 Unique links: {len(links)} ({len(done & set(links))} already ok, {len(pending)} to fetch)")
+
+    # Targeted recovery pass: only previously failed links matching the filters
+    if rescrape is not None:
+        organisation_of = {}
+        if "organisation" in df.columns:
+            organisation_of = dict(zip(df["fetch_canonical"], df["organisation"]))
+        wanted = set(links)
+        latest = store.latest()
+        pending = [url for url in select_for_rescrape(latest, organisation_of, **rescrape) if url in wanted]
+        by_reason = defaultdict(int)
+        for url in pending:
+            by_reason[latest[url].get("failure_reason") or latest[url].get("status")] += 1
+        print(f"🎯 Re-scrape selection: {len(pending)} links")
+        for reason, n in sorted(by_reason.items(), key=lambda kv: -kv[1]):
+            print(f"   {reason}: {n}")
+    if dry_run:
+        return
+
+    # Cleaned items into the shared store, updating extract00's rows in place
+    db = PipelineDB(PIPELINE_DB, text_store_root=TEXT_STORE or TEXT_STORE_DIR) if PIPELINE_DB else None
+    if db and "id" in df.columns:
+        db.upsert_items(df.rename(columns={"fetch_canonical": "article_link"}).to_dict("records"))
+
+    # Rows go straight to the store; only per-status counts are kept in memory
+    counts = defaultdict(int)
+    counts_lock = threading.Lock()
+
+    normaliser = TextNormaliser(ARTICLE_TEXT_COLUMNS) if NORMALISE_TEXT else None
+    texts = TextStore(TEXT_STORE) if TEXT_STORE else None
+
+    def on_row(row):
+        if normaliser:
+            with METRICS.timer("normalise"):
+                normaliser.normalise_rows([row])
+        if texts is not None:
+            # put() has synced the text before the row referencing it is committed
+            row["text_ref"] = texts.put(row["article_text"])
+        store.append({**row, "article_text": None} if texts is not None else row)
+        if db:
+            db.record_article(row, run_id=store.run_id)
+        with counts_lock:
+            counts[row["status"]] += 1
+        METRICS.inc("articles", labels={"status": row["status"], "failure_reason": row["failure_reason"] or ""})
+
+    store.start_run(total=len(links), pending=len(pending))
+    try:
+        scrape_articles(pending, on_row=on_row, collect=False)
+    except BaseException:
+        store.finish_run("interrupted")
+        raise
+    finally:
+        if normaliser:
+            normaliser.close()
+        if REDIRECTS is not None:
+            REDIRECTS.save()  # chains seen while fetching, for the next run
+    store.finish_run(
+        fetched=sum(counts.values()),
+        ok=counts["ok"],
+        failed=sum(counts.values()) - counts["ok"],
     )
+    if normaliser:
+        print(f"🧽 Text normalisation: {normaliser.summary()}")
+    if texts is not None:
+        print(f"🗜️  Article texts: {texts.summary()}")
+
+    if CACHE:
+        evicted = CACHE.evict()
+        if evicted:
+            print(f"🧹 Evicted {evicted} entries from the HTTP cache")
+
+    # Save articles table: latest stored row per link, streamed from the incremental store
+    offsets = store.offsets()
+    articles_path = with_format(ARTICLES_CSV, OUTPUT_FORMAT)
+
+    def stored_rows(urls, with_text=True):
+        # Store rows with article_text taken from the text store (older rows carry it inline)
+        for row in store.rows_at(offsets[url] for url in urls):
+            if texts is not None:
+                if row.get("text_ref") is None:
+                    row["text_ref"] = texts.put(row.get("article_text"))
+                elif with_text and row.get("article_text") is None:
+                    row["article_text"] = texts.get(row["text_ref"])
+            if not with_text:
+                row["article_text"] = None
+            yield row
+
+    # With a text store the articles table carries text_ref only
+    article_columns = [c for c in ARTICLE_COLUMNS if texts is None or c != "article_text"]
+    article_rows = stored_rows((url for url in links if url in offsets), with_text=texts is None)
+    if orgs:
+        article_rows = (orgs.tag(r, final_host(r["link_canonical"])) for r in article_rows)
+    with RowWriter(articles_path, columns=article_columns + list(ORG_COLUMNS),
+                   schema={**ARTICLE_SCHEMA, **ORG_SCHEMA}) as writer:
+        writer.write_many(article_rows)
+    print(f"✅ Wrote {writer.rows_written} article rows to {articles_path}")
+
+    if WRITE_MERGED_CSV:
+        # Merge back onto newsletter items, a chunk of items at a time, so article texts are
+        # read from the store only for the links in the current chunk. The join runs on
+        # interned integer link ids rather than the long URL strings.
+        url_ids = UrlTable(links)
+        df["link_id"] = url_ids.ids(df["fetch_canonical"])
+        merged_path = with_format(MERGED_OUTPUT_CSV, OUTPUT_FORMAT)
+        with RowWriter(merged_path, schema={**ITEM_SCHEMA, "article_link": "string", **ARTICLE_SCHEMA,
+                                            **ORG_SCHEMA}) as writer:
+            for start in range(0, len(df), MERGE_CHUNK_ROWS):
+                chunk = df.iloc[start:start + MERGE_CHUNK_ROWS]
+                chunk_links = [url for url in chunk["fetch_canonical"].unique() if url in offsets]
+                articles_df = pd.DataFrame(
+                    list(stored_rows(chunk_links, with_text=MERGED_INLINE_TEXT or texts is None)),
+                    columns=ARTICLE_COLUMNS,
+                ).drop(columns="link_canonical")
+                if texts is not None and not MERGED_INLINE_TEXT:
+                    articles_df = articles_df.drop(columns="article_text")
+                articles_df.insert(0, "link_id", [url_ids.id(url) for url in chunk_links])
+                merged = chunk.merge(
+                    articles_df.astype({"link_id": "Int64"}),
+                    on="link_id",
+                    how="left",
+                    validate="many_to_one",
+                )
+                # article_link: the link whose article was attached (a redirect target's or a
+                # near-duplicate's), so a shared article can be traced back
+                writer.write_frame(merged.drop(columns="link_id").rename(columns={"fetch_canonical": "article_link"}))
+        print(f"✅ Wrote merged dataset to {merged_path}")
+    if texts is not None:
+        texts.close()
 
-    merged.to_csv(MERGED_OUTPUT_CSV, index=False)
-    print(f"✅ Wrote merged dataset to {MERGED_OUTPUT_CSV}")
+    if db:
+        n = db.counts()
+        print(f"🗄️  Pipeline store {PIPELINE_DB}: {n['items']} items, {n['articles']} articles "
+              f"(merged view: items_with_articles)")
+        db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+# Selectable HTML parser backends for the extraction stages.
+# All backends build the same BeautifulSoup tree API, so iter_blocks, get_bg_color and
+# prefer_original_href work unchanged; only the tokenizer underneath differs.
+#   "html.parser" – stdlib, always available, slowest
+#   "lxml"        – C parser, fastest (pip install lxml)
+#   "html5lib"    – browser-grade error recovery, slowest of all (pip install html5lib)
+# check_parser_backends.py verifies a backend leaves newsletter_items.csv unchanged.
+
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+# backend name -> module that must be importable for it to work
+PARSER_MODULES = {
+    "html.parser": None,
+    "lxml": "lxml",
+    "html5lib": "html5lib",
+}
+
+# Fastest first; default_parser() picks the first one that is installed
+PARSER_PREFERENCE = ("lxml", "html.parser")
+
+
+def parser_available(name: str) -> bool:
+    if name not in PARSER_MODULES:
+        return False
+    module = PARSER_MODULES[name]
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def available_parsers() -> list[str]:
+    return [name for name in PARSER_MODULES if parser_available(name)]
+
+
+def default_parser() -> str:
+    for name in PARSER_PREFERENCE:
+        if parser_available(name):
+            return name
+    return "html.parser"
+
+
+def make_soup(html: str, parser: str = "html.parser") -> BeautifulSoup:
+    """
+    Build a BeautifulSoup tree with the chosen backend.
+
+    Attribute names are lower-cased by every backend, so Outlook's `originalsrc`,
+    `bgcolor` and inline `style` are read the same way whichever one is used.
+    """
+    if parser not in PARSER_MODULES:
+        raise ValueError(f"Unknown HTML parser {parser!r}; choose from {sorted(PARSER_MODULES)}")
+    if not parser_available(parser):
+        raise ValueError(
+            f"HTML parser {parser!r} is not installed (pip install {PARSER_MODULES[parser]}); "
+            f"available: {available_parsers()}"
+        )
+    return BeautifulSoup(html, parser)
@@ -0,0 +1,209 @@
+# On-disk HTTP response cache used by extract01_full_article.fetch_html.
+# Each canonical URL maps to a content-addressed entry (sha256 of the URL) holding the raw body
+# plus a small JSON record: status, final URL, response headers, encoding and fetch time.
+# Entries are served directly while fresh (TTL), revalidated with ETag / Last-Modified once stale,
+# and evicted least-recently-used first when the cache grows past its size budget.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+
+# -----------------------------
+# CACHE ENTRY
+# -----------------------------
+@dataclass
+class CacheEntry:
+    url: str
+    status: int
+    final_url: str
+    headers: dict = field(default_factory=dict)
+    encoding: str | None = None
+    fetched_at: float = 0.0
+    body: bytes = b""
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    def age(self, now: float | None = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+    def validators(self) -> dict:
+        """Conditional request headers that let the server answer 304 Not Modified."""
+        h = {k.lower(): v for k, v in self.headers.items()}
+        out = {}
+        if h.get("etag"):
+            out["If-None-Match"] = h["etag"]
+        if h.get("last-modified"):
+            out["If-Modified-Since"] = h["last-modified"]
+        return out
+
+
+# -----------------------------
+# CACHE
+# -----------------------------
+class HttpCache:
+    """
+    Content-addressed response cache on disk.
+
+    Layout: <root>/<aa>/<sha256>.json (metadata) and <root>/<aa>/<sha256>.body (raw bytes).
+    Writes go through a temp file + os.replace, so concurrent fetch threads never see partial entries.
+    """
+
+    def __init__(self, root: str, ttl: float = 7 * 24 * 3600, max_bytes: int = 2 * 1024**3):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    # ---- paths ----
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        k = self.key(url)
+        base = os.path.join(self.root, k[:2], k)
+        return base + ".json", base + ".body"
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    # ---- read ----
+    def get(self, url: str) -> CacheEntry | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        # Touch the metadata so LRU eviction sees this entry as recently used
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return CacheEntry(body=body, **meta)
+
+    def final_url(self, url: str) -> str | None:
+        """Where a cached `url` ended up after redirects, from its metadata alone (body not read)."""
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("final_url") or None
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() < self.ttl
+
+    # ---- write ----
+    def put(self, url: str, status: int, final_url: str, headers: dict,
+            body: bytes, encoding: str | None = None) -> CacheEntry:
+        entry = CacheEntry(
+            url=url,
+            status=status,
+            final_url=final_url,
+            headers=dict(headers),
+            encoding=encoding,
+            fetched_at=time.time(),
+            body=body,
+        )
+        meta_path, body_path = self._paths(url)
+        meta = {k: v for k, v in entry.__dict__.items() if k != "body"}
+        # Body first: a metadata file always points at a complete body
+        self._atomic_write(body_path, body)
+        self._atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        return entry
+
+    def revalidated(self, entry: CacheEntry, headers: dict) -> CacheEntry:
+        """Record a 304: keep the stored body, refresh fetch time and any updated validators."""
+        merged = dict(entry.headers)
+        merged.update({k: v for k, v in headers.items()
+                       if k.lower() in ("etag", "last-modified", "cache-control", "expires", "date")})
+        return self.put(entry.url, entry.status, entry.final_url, merged, entry.body, entry.encoding)
+
+    # ---- eviction ----
+    def _entries(self):
+        """Yield (meta_path, body_path, last_used, size) for every stored entry."""
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith(".json"):
+                    continue
+                meta_path = os.path.join(shard_dir, name)
+                body_path = meta_path[:-len(".json")] + ".body"
+                try:
+                    st = os.stat(meta_path)
+                    size = st.st_size + (os.path.getsize(body_path) if os.path.exists(body_path) else 0)
+                except OSError:
+                    continue
+                yield meta_path, body_path, st.st_mtime, size
+
+    def iter_entries(self):
+        """Every stored entry (without marking them as used)."""
+        for meta_path, body_path, _, _ in self._entries():
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                with open(body_path, "rb") as f:
+                    body = f.read()
+            except (OSError, ValueError):
+                continue
+            yield CacheEntry(body=body, **meta)
+
+    @staticmethod
+    def _remove(meta_path: str, body_path: str) -> None:
+        for p in (meta_path, body_path):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def evict(self, max_age: float | None = None) -> int:
+        """
+        Drop entries not used for `max_age` seconds (if given), then least-recently-used
+        entries until the cache fits in `max_bytes`. Returns the number of entries removed.
+        """
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        now = time.time()
+        removed = 0
+
+        kept = []
+        for meta_path, body_path, last_used, size in entries:
+            if max_age is not None and now - last_used > max_age:
+                self._remove(meta_path, body_path)
+                removed += 1
+            else:
+                kept.append((meta_path, body_path, size))
+
+        total = sum(size for _, _, size in kept)
+        for meta_path, body_path, size in kept:
+            if total <= self.max_bytes:
+                break
+            self._remove(meta_path, body_path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
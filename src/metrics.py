@@ -0,0 +1,220 @@
+# Lightweight run instrumentation for the extraction stages.
+# Records per-stage wall-clock timings, counters (e.g. failure reasons, bytes downloaded) and
+# latency histograms (e.g. per-domain fetch time), and exports them as a JSON run report and as
+# a Prometheus text-format file.
+#
+# Switch on per run with environment variables, no code changes needed:
+#   ERP_METRICS_DIR=/some/dir   write <stage>_<timestamp>.json and .prom there at the end of the run
+#   ERP_PROFILE=1               also run the stage under cProfile and save <stage>_<timestamp>.prof
+
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+METRICS_DIR_ENV = "ERP_METRICS_DIR"
+PROFILE_ENV = "ERP_PROFILE"
+
+# Latency buckets in seconds (Prometheus-style upper bounds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _labels_key(labels: dict | None) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+class Metrics:
+    """Thread-safe collector of stage timings, counters and histograms for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.stages = {}      # stage -> {"calls", "seconds", "max"}
+            self.counters = {}    # (name, labels) -> value
+            self.histograms = {}  # (name, labels) -> {"buckets", "counts", "sum", "count"}
+
+    # ---- recording ----
+    def add_time(self, stage: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            s = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "max": 0.0})
+            s["calls"] += calls
+            s["seconds"] += seconds
+            s["max"] = max(s["max"], seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - t0)
+
+    def inc(self, name: str, value: float = 1, labels: dict | None = None) -> None:
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: dict | None = None,
+                buckets=DEFAULT_BUCKETS) -> None:
+        key = (name, _labels_key(labels))
+        with self._lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = {
+                    "buckets": list(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0,
+                }
+            for i, bound in enumerate(h["buckets"]):
+                if value <= bound:
+                    h["counts"][i] += 1
+            h["sum"] += value
+            h["count"] += 1
+
+    # ---- combining (e.g. results from worker processes) ----
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "counters": [[n, list(l), v] for (n, l), v in self.counters.items()],
+                "histograms": [[n, list(l), dict(h, counts=list(h["counts"]))]
+                               for (n, l), h in self.histograms.items()],
+            }
+
+    def merge(self, snap: dict) -> None:
+        with self._lock:
+            for stage, s in snap["stages"].items():
+                cur = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "max": 0.0})
+                cur["calls"] += s["calls"]
+                cur["seconds"] += s["seconds"]
+                cur["max"] = max(cur["max"], s["max"])
+            for name, labels, value in snap["counters"]:
+                key = (name, tuple(tuple(x) for x in labels))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, h in snap["histograms"]:
+                key = (name, tuple(tuple(x) for x in labels))
+                cur = self.histograms.get(key)
+                if cur is None:
+                    self.histograms[key] = dict(h, counts=list(h["counts"]))
+                    continue
+                cur["counts"] = [a + b for a, b in zip(cur["counts"], h["counts"])]
+                cur["sum"] += h["sum"]
+                cur["count"] += h["count"]
+
+    # ---- export ----
+    def report(self, run: str) -> dict:
+        with self._lock:
+            return {
+                "run": run,
+                "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+                "wall_seconds": time.time() - self.started,
+                "stages": {
+                    k: dict(v, mean=v["seconds"] / v["calls"] if v["calls"] else 0.0)
+                    for k, v in sorted(self.stages.items())
+                },
+                "counters": [
+                    {"name": n, "labels": dict(l), "value": v}
+                    for (n, l), v in sorted(self.counters.items())
+                ],
+                "histograms": [
+                    {"name": n, "labels": dict(l), **h}
+                    for (n, l), h in sorted(self.histograms.items())
+                ],
+            }
+
+    def prometheus_text(self, prefix: str = "erp") -> str:
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+        def metric_name(name):
+            return re.sub(r"[^a-zA-Z0-9_]", "_", f"{prefix}_{name}")
+
+        lines = []
+        with self._lock:
+            lines.append(f"# TYPE {prefix}_stage_seconds_total counter")
+            for stage, s in sorted(self.stages.items()):
+                lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {s["seconds"]:.6f}')
+            lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+            for stage, s in sorted(self.stages.items()):
+                lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {s["calls"]}')
+
+            seen = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                m = metric_name(name) + "_total"
+                if m not in seen:
+                    lines.append(f"# TYPE {m} counter")
+                    seen.add(m)
+                lines.append(f"{m}{fmt_labels(labels)} {value}")
+
+            for (name, labels), h in sorted(self.histograms.items()):
+                m = metric_name(name)
+                if m not in seen:
+                    lines.append(f"# TYPE {m} histogram")
+                    seen.add(m)
+                for bound, count in zip(h["buckets"], h["counts"]):
+                    lines.append(f"{m}_bucket{fmt_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{m}_bucket{fmt_labels(labels, [('le', '+Inf')])} {h['count']}")
+                lines.append(f"{m}_sum{fmt_labels(labels)} {h['sum']:.6f}")
+                lines.append(f"{m}_count{fmt_labels(labels)} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, run: str, directory: str | None = None) -> str | None:
+        """Write <run>_<timestamp>.json and .prom into `directory` (or $ERP_METRICS_DIR)."""
+        directory = directory or os.environ.get(METRICS_DIR_ENV)
+        if not directory:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{run}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.report(run), f, indent=1)
+        with open(base + ".prom", "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        return base
+
+    def summary(self) -> str:
+        """One line per stage, slowest first, for printing at the end of a run."""
+        rows = sorted(self.stages.items(), key=lambda kv: -kv[1]["seconds"])
+        return "\n".join(
+            f"   {stage:<24}{s['seconds']:>10.2f}s  over {s['calls']} calls" for stage, s in rows
+        )
+
+
+# Process-wide collector used by the stages
+METRICS = Metrics()
+
+
+@contextmanager
+def instrumented_run(run: str):
+    """
+    Wrap a stage's main(): resets METRICS, optionally profiles (ERP_PROFILE=1) and exports
+    the JSON / Prometheus reports when ERP_METRICS_DIR is set.
+    """
+    METRICS.reset()
+    profiler = cProfile.Profile() if os.environ.get(PROFILE_ENV) == "1" else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield METRICS
+    finally:
+        if profiler:
+            profiler.disable()
+        base = METRICS.export(run)
+        if base:
+            if profiler:
+                profiler.dump_stats(base + ".prof")
+            print(f"📈 Metrics written to {base}.json / .prom" + (" / .prof" if profiler else ""))
+            print(METRICS.summary())
+        elif profiler:
+            path = f"{run}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+            profiler.dump_stats(path)
+            print(f"📈 Profile written to {path}")
@@ -0,0 +1,229 @@
+# Near-duplicate clustering for newsletter items and scraped articles.
+# The exact-key dedupe in extract00 (slug title + canonical link) and the drop_duplicates passes in
+# notebook 0 miss syndicated articles, retitled reposts and the same report linked from different
+# URLs. Here every row is reduced to word shingles of its title, description and article_text,
+# summarised as a MinHash signature, and LSH banding proposes candidate pairs, so rows are only
+# compared with rows that share a band (no all-pairs comparison). Candidates whose estimated
+# Jaccard similarity clears SIMILARITY_THRESHOLD are merged with union-find.
+#
+# Output is a small sidecar table keyed by item id: cluster_id (the representative's id),
+# cluster_size and is_representative. extract01_full_article reads it, but a clustered item only
+# shares the representative's fetch when both links are the same page (same canonical or known final
+# URL, see representative_links()). Syndicated copies and reposts at different URLs stay in one
+# cluster for analysis yet are each fetched, so clusters save no fetches for them.
+#
+# Usage:
+#   python src/near_dupes.py                                   # cluster the extract00 items
+#   python src/near_dupes.py --input merged.csv --output merged_clusters.csv
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from redirects import equivalence_key
+from row_writer import ARTICLE_SCHEMA, ITEM_SCHEMA, RowWriter, read_table
+from text_store import attach_text
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+INPUT_CSV = "/workspaces/ERP_Newsletter/data/data01_newsletter_items/newsletter_items.csv"
+CLUSTERS_CSV = "/workspaces/ERP_Newsletter/data/data01_newsletter_items/newsletter_items_clusters.csv"
+TEXT_COLUMNS = ("title", "description", "article_text")
+
+SHINGLE_WORDS = 3          # words per shingle
+NUM_PERM = 128             # MinHash signature length
+BANDS = 32                 # LSH bands; rows per band = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.6 # estimated Jaccard needed to join a cluster
+MAX_BUCKET = 200           # ignore LSH buckets bigger than this (boilerplate shared by everything)
+SEED = 20250101
+
+CLUSTER_SCHEMA = {"id": "string", "cluster_id": "string", "cluster_size": "Int64", "is_representative": "boolean"}
+
+_MERSENNE = (1 << 31) - 1
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# -----------------------------
+# SHINGLES + MINHASH
+# -----------------------------
+def shingles(text: str, k: int = SHINGLE_WORDS) -> set[str]:
+    """Lower-cased word k-grams (the words themselves when the text is shorter than k)."""
+    words = _TOKEN_RE.findall((text or "").lower())
+    if len(words) < k:
+        return set(words)
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def _hash32(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class MinHasher:
+    """MinHash over universal hashes (a*x + b) mod (2^31 - 1), vectorised with numpy."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE, size=num_perm, dtype=np.int64)
+        self.b = rng.integers(0, _MERSENNE, size=num_perm, dtype=np.int64)
+
+    def signature(self, shingle_set: set[str]) -> np.ndarray | None:
+        if not shingle_set:
+            return None
+        x = np.fromiter((_hash32(s) for s in shingle_set), dtype=np.int64, count=len(shingle_set)) % _MERSENNE
+        return ((np.outer(self.a, x) + self.b[:, None]) % _MERSENNE).min(axis=1)
+
+
+# -----------------------------
+# UNION-FIND
+# -----------------------------
+class DisjointSet:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+# -----------------------------
+# CLUSTERING
+# -----------------------------
+def document_text(row: dict, columns=TEXT_COLUMNS) -> str:
+    return " ".join(str(row[c]) for c in columns if row.get(c) is not None)
+
+
+def cluster_rows(texts: list[str], bands: int = BANDS, threshold: float = SIMILARITY_THRESHOLD,
+                 num_perm: int = NUM_PERM) -> tuple[list[int], dict]:
+    """
+    Cluster label (index of the cluster's first row) for every text, plus run statistics.
+    Rows with no words stay in clusters of their own.
+    """
+    rows_per_band = num_perm // bands
+    hasher = MinHasher(num_perm)
+    sigs = [hasher.signature(shingles(t)) for t in texts]
+
+    buckets = defaultdict(list)
+    for i, sig in enumerate(sigs):
+        if sig is None:
+            continue
+        for b in range(bands):
+            band = sig[b * rows_per_band:(b + 1) * rows_per_band]
+            buckets[(b, band.tobytes())].append(i)
+
+    ds = DisjointSet(len(texts))
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > MAX_BUCKET:
+            continue
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                if (i, j) in checked or ds.find(i) == ds.find(j):
+                    continue
+                checked.add((i, j))
+                if np.mean(sigs[i] == sigs[j]) >= threshold:
+                    ds.union(i, j)
+
+    labels = [ds.find(i) for i in range(len(texts))]
+    stats = {"rows": len(texts), "candidate_pairs": len(checked), "clusters": len(set(labels))}
+    return labels, stats
+
+
+def assign_clusters(df: pd.DataFrame, id_column: str = "id", columns=TEXT_COLUMNS) -> pd.DataFrame:
+    """
+    Sidecar table (id, cluster_id, cluster_size, is_representative) for `df`.
+    The representative of each cluster is a row with a link if it has any, then the longest text,
+    then the earliest row; cluster_id is that row's id, so ids stay stable while the cluster does.
+    """
+    present = [c for c in columns if c in df.columns]
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    texts = [document_text(r, present) for r in records]
+    labels, stats = cluster_rows(texts)
+
+    members = defaultdict(list)
+    for i, label in enumerate(labels):
+        members[label].append(i)
+    rep = {}
+    for label, idx in members.items():
+        rep[label] = max(idx, key=lambda i: (bool(records[i].get("link")), len(texts[i]), -i))
+
+    ids = df[id_column].tolist()
+    out = pd.DataFrame({
+        "id": ids,
+        "cluster_id": [ids[rep[label]] for label in labels],
+        "cluster_size": [len(members[label]) for label in labels],
+        "is_representative": [rep[label] == i for i, label in enumerate(labels)],
+    })
+    out.attrs["stats"] = stats
+    return out
+
+
+def load_clusters(path: str = CLUSTERS_CSV) -> pd.DataFrame | None:
+    """The sidecar written by main(), or None if clustering has not been run."""
+    if not os.path.exists(path):
+        return None
+    return read_table(path, schema=CLUSTER_SCHEMA)
+
+
+def representative_links(df: pd.DataFrame, clusters: pd.DataFrame, link_column: str = "link_canonical",
+                         page_key=equivalence_key) -> pd.Series:
+    """
+    `df[link_column]` with each row's link swapped for its cluster representative's link, so a
+    cluster is fetched once. Similar text alone does not make two links the same article (extract00
+    can run one item's description into the next), so a row only takes the representative's link
+    when page_key() maps both links to the same page; page_key=None swaps every clustered row.
+    Rows whose representative is not in `df` (or has no link) keep their own.
+    """
+    cluster_of = clusters.drop_duplicates("id").set_index("id")["cluster_id"]
+    link_of = df.drop_duplicates("id").set_index("id")[link_column]
+    rep_link = df["id"].map(cluster_of).map(link_of)
+    keep = rep_link.isna() | (rep_link == "")
+    if page_key is not None:
+        keys = {u: page_key(u) for u in pd.concat([df[link_column], rep_link]).dropna().unique() if u}
+        keep |= rep_link.map(keys) != df[link_column].map(keys)
+    return rep_link.where(~keep, df[link_column])
+
+
+# -----------------------------
+# DRIVER
+# -----------------------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Near-duplicate clustering with MinHash/LSH.")
+    ap.add_argument("--input", default=INPUT_CSV, help="items or merged items+articles table (CSV or Parquet)")
+    ap.add_argument("--output", default=CLUSTERS_CSV)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    df = attach_text(read_table(args.input, schema={**ITEM_SCHEMA, **ARTICLE_SCHEMA}))
+    clusters = assign_clusters(df)
+    stats = clusters.attrs["stats"]
+    with RowWriter(args.output, columns=list(CLUSTER_SCHEMA), schema=CLUSTER_SCHEMA) as writer:
+        writer.write_frame(clusters)
+
+    dupes = int((~clusters["is_representative"]).sum())
+    print(f"🧬 {stats['rows']} rows -> {stats['clusters']} clusters ({dupes} near-duplicates, "
+          f"{stats['candidate_pairs']} candidate pairs checked) in {time.perf_counter() - t0:.2f}s")
+    big = clusters[clusters["is_representative"] & (clusters["cluster_size"] > 1)]
+    for cid in big.sort_values("cluster_size", ascending=False)["cluster_id"].head(5):
+        titles = df.loc[clusters["cluster_id"] == cid, "title"].head(3).tolist()
+        print(f"   {len(clusters[clusters['cluster_id'] == cid])} x {titles[0]!r}")
+    print(f"✅ Wrote clusters to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
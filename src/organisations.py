@@ -0,0 +1,178 @@
+# Domain -> organisation classification for newsletter items and scraped articles.
+# The organisation / org_broad_category / org_category columns the notebooks analyse used to be
+# assigned by hand in notebook 0 (domain_to_org + org_to_category). The mapping now lives in one
+# maintained table, data/reference/organisation_rules.csv (domain, organisation, org_broad_category,
+# org_category), and both extraction stages tag their rows from it, so the columns stay current.
+#
+# Rules are loaded into a suffix trie keyed on reversed host labels (uk -> gov -> www), so a rule
+# covers its subdomains and the longest matching rule wins: "www.gov.uk" also classifies
+# "assets.publishing.service.gov.uk", while "www.childrenscommissioner.gov.uk" keeps its own rule.
+# A leading "www." is ignored on both sides. Organisation "REMOVE" marks domains the notebooks
+# drop (event pages, mailing-list redirects); it is passed through, not filtered here.
+#
+# Usage (coverage report over a table with a link or domain column):
+#   python src/organisations.py /workspaces/ERP_Newsletter/data/data01_newsletter_items/newsletter_items.csv
+
+import argparse
+import csv
+import sys
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+import pandas as pd
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+ORG_RULES_CSV = "/workspaces/ERP_Newsletter/data/reference/organisation_rules.csv"
+ORG_COLUMNS = ("organisation", "org_broad_category", "org_category")
+ORG_SCHEMA = {c: "category" for c in ORG_COLUMNS}
+REMOVE = "REMOVE"
+
+
+class OrgMatch(NamedTuple):
+    organisation: str | None
+    org_broad_category: str | None
+    org_category: str | None
+    rule: str | None = None  # the domain rule that matched
+
+
+NO_MATCH = OrgMatch(None, None, None)
+
+
+def host_labels(host: str) -> list[str]:
+    """Reversed DNS labels of a host, lower-cased, without port or a leading "www."."""
+    host = (host or "").strip().lower().split(":", 1)[0].rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host.split(".")[::-1] if host else []
+
+
+# -----------------------------
+# SUFFIX TRIE
+# -----------------------------
+class SuffixTrie:
+    """Trie over reversed host labels; longest_match() returns the value of the deepest rule on the path."""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, host: str, value) -> None:
+        node = self.root
+        for label in host_labels(host):
+            node = node.setdefault(label, {})
+        node[None] = value  # None never collides with a label
+
+    def longest_match(self, host: str):
+        node, best = self.root, None
+        for label in host_labels(host):
+            node = node.get(label)
+            if node is None:
+                break
+            best = node.get(None, best)
+        return best
+
+
+# -----------------------------
+# CLASSIFIER
+# -----------------------------
+class OrgClassifier:
+    """Classify hosts by the longest matching domain rule; each distinct host is looked up once."""
+
+    def __init__(self, rules=()):
+        self.trie = SuffixTrie()
+        self.rules = 0
+        self._memo = {}
+        categories = {}
+        for domain, organisation, broad, category in rules:
+            broad, category = broad or None, category or None
+            seen = categories.setdefault(organisation, (broad, category))
+            if seen != (broad, category):
+                raise ValueError(f"Organisation {organisation!r} has two categories: {seen} and {(broad, category)}")
+            self.trie.insert(domain, OrgMatch(organisation, broad, category, domain))
+            self.rules += 1
+
+    @classmethod
+    def from_csv(cls, path: str = ORG_RULES_CSV) -> "OrgClassifier":
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(
+                (r["domain"], r["organisation"], r["org_broad_category"], r["org_category"])
+                for r in csv.DictReader(f)
+                if r["domain"].strip()
+            )
+
+    def classify(self, host: str | None) -> OrgMatch:
+        if not isinstance(host, str):
+            return NO_MATCH
+        match = self._memo.get(host)
+        if match is None:
+            match = self._memo[host] = self.trie.longest_match(host) or NO_MATCH
+        return match
+
+    def tag(self, row: dict, host: str | None) -> dict:
+        """Set ORG_COLUMNS on `row` (in place) from `host`."""
+        row.update(zip(ORG_COLUMNS, self.classify(host)[:3]))
+        return row
+
+    def tag_rows(self, rows: list[dict], hosts) -> list[dict]:
+        """tag() each row with the matching entry of `hosts`."""
+        for r, host in zip(rows, hosts):
+            self.tag(r, host)
+        return rows
+
+    def tag_frame(self, df: pd.DataFrame, hosts: pd.Series) -> pd.DataFrame:
+        """Copy of `df` with ORG_COLUMNS set from `hosts` (one lookup per distinct host)."""
+        df = df.copy()
+        codes, uniques = pd.factorize(hosts)
+        matches = [self.classify(h) for h in uniques] + [NO_MATCH]  # code -1 (missing) -> NO_MATCH
+        for i, col in enumerate(ORG_COLUMNS):
+            lookup = pd.array([m[i] for m in matches], dtype="string")
+            df[col] = pd.Series(lookup.take(codes), index=df.index, dtype="string")
+        return df
+
+
+def hosts_of(links: pd.Series) -> pd.Series:
+    """Host of every link in a Series (computed once per distinct link)."""
+    codes, uniques = pd.factorize(links)
+    lookup = pd.array([urlparse(u).netloc if isinstance(u, str) else None for u in uniques] + [None], dtype="string")
+    return pd.Series(lookup.take(codes), index=links.index, dtype="string")
+
+
+def load_classifier(path: str | None = ORG_RULES_CSV) -> OrgClassifier | None:
+    """The classifier for `path`, or None (with a warning) when the rules table is missing."""
+    if not path:
+        return None
+    try:
+        return OrgClassifier.from_csv(path)
+    except FileNotFoundError:
+        print(f"⚠️  Organisation rules not found at {path}; organisation columns left empty")
+        return None
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None) -> int:
+    from row_writer import read_table
+
+    ap = argparse.ArgumentParser(description="Report how well the organisation rules cover a table's domains.")
+    ap.add_argument("input", help="CSV or Parquet with a 'domain' or 'link' column")
+    ap.add_argument("--rules", default=ORG_RULES_CSV)
+    ap.add_argument("-n", "--top", type=int, default=20, help="unmatched domains to list")
+    args = ap.parse_args(argv)
+
+    classifier = OrgClassifier.from_csv(args.rules)
+    df = read_table(args.input)
+    hosts = df["domain"] if "domain" in df.columns else hosts_of(df["link"])
+    tagged = classifier.tag_frame(df, hosts)
+    matched = tagged["organisation"].notna()
+    print(f"🏷️  {classifier.rules} rules; {matched.sum()}/{len(df)} rows matched "
+          f"({hosts[matched].nunique()} domains), {int((tagged['organisation'] == REMOVE).sum())} marked {REMOVE}")
+    unmatched = hosts[~matched].value_counts().head(args.top)
+    for host, n in unmatched.items():
+        print(f"   {n:>4}  {host}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
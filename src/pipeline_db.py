@@ -0,0 +1,472 @@
+# Embedded SQLite store shared by the pipeline stages, in place of full CSV rewrites between them.
+# Tables:
+#   newsletters     one row per archive file (number, date, content hash)
+#   items           newsletter items keyed by their stable id, indexed on link_canonical
+#   articles        one scraped article per link_canonical; its text lives once in the article text
+#                   store (text_store.py) and the row carries only its text_ref
+#   fetch_attempts  every fetch outcome, per run, for retry analysis
+# extract00_newsletters upserts newsletters + items (and drops those of archive files that are gone),
+# extract01_full_article upserts items (the cleaned versions) + articles + attempts. The items-with-articles table is a view (items_with_articles),
+# so nothing copies article text onto each item; merged_frame() reads it into pandas on demand
+# (with_text=True resolves the refs through the text store).
+#
+# item_rollup holds item counts pre-aggregated by newsletter, month, theme, subtheme, organisation,
+# domain and scrape status (ROLLUP_DIMENSIONS). Triggers on items and articles keep it current as
+# either stage writes, so rollup() answers the notebooks' groupby tables without reading items:
+#   python src/pipeline_db.py issue_month theme
+#   python src/pipeline_db.py organisation --columns status --where org_broad_category=government_public_sector
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from text_store import TEXT_STORE_DIR, TextStore, attach_text
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+PIPELINE_DB = "/workspaces/ERP_Newsletter/data/pipeline.sqlite"
+
+ITEM_COLUMNS = ("id", "source_file", "newsletter_number", "issue_date", "theme", "subtheme",
+                "title", "description", "link", "link_canonical", "article_link",
+                "new_theme", "organisation", "org_broad_category", "org_category")
+# Set from issue_date / link_canonical on every upsert, for the rollups
+DERIVED_COLUMNS = ("issue_month", "domain")
+ARTICLE_COLUMNS = ("link_canonical", "article_id", "domain", "article_title", "text_ref", "status",
+                   "failure_reason")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS newsletters (
+    source_file TEXT PRIMARY KEY,
+    newsletter_number INTEGER,
+    issue_date TEXT,
+    sha256 TEXT,
+    item_count INTEGER,
+    parsed_at REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    source_file TEXT,
+    newsletter_number INTEGER,
+    issue_date TEXT,
+    theme TEXT,
+    new_theme TEXT,         -- notebook 0's cleaned theme, on the cleaned items extract01 upserts
+    subtheme TEXT,
+    title TEXT,
+    description TEXT,
+    link TEXT,
+    link_canonical TEXT,
+    article_link TEXT,      -- link whose article stands for this item (a near-duplicate's), else link_canonical
+    organisation TEXT,      -- from the domain rules (organisations.py)
+    org_broad_category TEXT,
+    org_category TEXT,
+    issue_month TEXT,       -- YYYY-MM
+    domain TEXT,            -- host of link_canonical
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS items_link_canonical ON items(link_canonical);
+CREATE INDEX IF NOT EXISTS items_source_file ON items(source_file);
+CREATE INDEX IF NOT EXISTS items_article_key ON items(COALESCE(article_link, link_canonical));
+CREATE TABLE IF NOT EXISTS articles (
+    link_canonical TEXT PRIMARY KEY,
+    article_id TEXT,
+    domain TEXT,
+    article_title TEXT,
+    text_ref TEXT,          -- the text's key in the article text store (text_store.py)
+    status TEXT,
+    failure_reason TEXT,
+    fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS articles_domain ON articles(domain);
+CREATE TABLE IF NOT EXISTS fetch_attempts (
+    attempt_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    link_canonical TEXT NOT NULL,
+    run_id TEXT,
+    status TEXT,
+    failure_reason TEXT,
+    attempted_at REAL
+);
+CREATE INDEX IF NOT EXISTS fetch_attempts_link ON fetch_attempts(link_canonical);
+"""
+
+# Recreated on every open, so databases from before a column was added get the current view
+VIEW_SQL = """
+DROP VIEW IF EXISTS items_with_articles;
+CREATE VIEW items_with_articles AS
+    SELECT i.id, i.newsletter_number, i.issue_date, i.theme, i.subtheme, i.title, i.description,
+           i.link, i.link_canonical, i.organisation, i.org_broad_category, i.org_category,
+           a.article_id, a.domain, a.article_title, a.text_ref, a.status, a.failure_reason
+    FROM items i LEFT JOIN articles a ON a.link_canonical = COALESCE(i.article_link, i.link_canonical);
+"""
+
+# -----------------------------
+# ROLLUPS
+# -----------------------------
+# theme is notebook 0's new_theme where the cleaned items carry one, else the parsed theme;
+# status / failure_reason are the item's article's (NULL while it has not been scraped)
+ROLLUP_DIMENSIONS = ("newsletter_number", "issue_month", "theme", "subtheme", "organisation",
+                     "org_broad_category", "org_category", "domain", "status", "failure_reason")
+_ITEM_DIMENSIONS = ("{i}.newsletter_number", "{i}.issue_month", "COALESCE({i}.new_theme, {i}.theme)",
+                    "{i}.subtheme", "{i}.organisation", "{i}.org_broad_category", "{i}.org_category",
+                    "{i}.domain")
+_ARTICLE_DIMENSIONS = ("{a}.status", "{a}.failure_reason")
+
+ROLLUP_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS item_rollup (
+    key TEXT PRIMARY KEY,   -- json_array of the dimension values (NULLs included)
+    {", ".join(f"{d} {'INTEGER' if d == 'newsletter_number' else 'TEXT'}" for d in ROLLUP_DIMENSIONS)},
+    items INTEGER NOT NULL
+);
+"""
+
+
+def _rollup_delta(item: str, article: str | None, sign: str, source: str) -> str:
+    """
+    Statement adding `sign` * (number of rows in `source`) to each rollup cell, with item columns
+    read from alias `item` and status columns from alias `article` (None: no article yet).
+    """
+    dims = [d.format(i=item) for d in _ITEM_DIMENSIONS] + \
+        [d.format(a=article) if article else "NULL" for d in _ARTICLE_DIMENSIONS]
+    return (
+        f"INSERT INTO item_rollup (key, {', '.join(ROLLUP_DIMENSIONS)}, items)"
+        f" SELECT json_array({', '.join(dims)}), {', '.join(dims)}, {sign}COUNT(*) FROM {source}"
+        f" GROUP BY {', '.join(dims)}"
+        " ON CONFLICT(key) DO UPDATE SET items = items + excluded.items;"
+    )
+
+
+# An item's cell moves when its own columns or its article's status change. Cells that drop to
+# zero are kept (rollup() skips them) until rebuild_rollups().
+_ITEM_ARTICLE = "(SELECT 1) LEFT JOIN articles a ON a.link_canonical = COALESCE({i}.article_link, {i}.link_canonical)"
+_LINKED_ITEMS = "items i WHERE COALESCE(i.article_link, i.link_canonical) = {a}.link_canonical"
+_ITEM_KEY = "json_array({})".format(", ".join(_ITEM_DIMENSIONS + ("COALESCE({i}.article_link, {i}.link_canonical)",)))
+
+ROLLUP_TRIGGERS_SQL = f"""
+DROP TRIGGER IF EXISTS item_rollup_item_insert;
+CREATE TRIGGER item_rollup_item_insert AFTER INSERT ON items BEGIN
+    {_rollup_delta("NEW", "a", "", _ITEM_ARTICLE.format(i="NEW"))}
+END;
+DROP TRIGGER IF EXISTS item_rollup_item_delete;
+CREATE TRIGGER item_rollup_item_delete AFTER DELETE ON items BEGIN
+    {_rollup_delta("OLD", "a", "-", _ITEM_ARTICLE.format(i="OLD"))}
+END;
+DROP TRIGGER IF EXISTS item_rollup_item_update;
+CREATE TRIGGER item_rollup_item_update AFTER UPDATE ON items
+WHEN {_ITEM_KEY.format(i="OLD")} IS NOT {_ITEM_KEY.format(i="NEW")} BEGIN
+    {_rollup_delta("OLD", "a", "-", _ITEM_ARTICLE.format(i="OLD"))}
+    {_rollup_delta("NEW", "a", "", _ITEM_ARTICLE.format(i="NEW"))}
+END;
+DROP TRIGGER IF EXISTS item_rollup_article_insert;
+CREATE TRIGGER item_rollup_article_insert AFTER INSERT ON articles BEGIN
+    {_rollup_delta("i", None, "-", _LINKED_ITEMS.format(a="NEW"))}
+    {_rollup_delta("i", "NEW", "", _LINKED_ITEMS.format(a="NEW"))}
+END;
+DROP TRIGGER IF EXISTS item_rollup_article_update;
+CREATE TRIGGER item_rollup_article_update AFTER UPDATE ON articles
+WHEN OLD.status IS NOT NEW.status OR OLD.failure_reason IS NOT NEW.failure_reason BEGIN
+    {_rollup_delta("i", "OLD", "-", _LINKED_ITEMS.format(a="OLD"))}
+    {_rollup_delta("i", "NEW", "", _LINKED_ITEMS.format(a="NEW"))}
+END;
+DROP TRIGGER IF EXISTS item_rollup_article_delete;
+CREATE TRIGGER item_rollup_article_delete AFTER DELETE ON articles BEGIN
+    {_rollup_delta("i", "OLD", "-", _LINKED_ITEMS.format(a="OLD"))}
+    {_rollup_delta("i", None, "", _LINKED_ITEMS.format(a="OLD"))}
+END;
+"""
+
+ROLLUP_REBUILD_SQL = "DELETE FROM item_rollup;\n" + _rollup_delta(
+    "i", "a", "", "items i LEFT JOIN articles a ON a.link_canonical = COALESCE(i.article_link, i.link_canonical)"
+)
+
+
+@lru_cache(maxsize=4096)
+def issue_month(issue_date) -> str | None:
+    """"11 July 2023" (or any date pandas reads, day first) -> "2023-07"."""
+    d = pd.to_datetime(issue_date, dayfirst=True, errors="coerce")
+    return None if pd.isna(d) else d.strftime("%Y-%m")
+
+
+def _derived(issue_date, link_canonical) -> tuple:
+    """DERIVED_COLUMNS for an item; None where the source value is missing."""
+    return (
+        issue_month(issue_date) if isinstance(issue_date, str) else None,
+        (urlparse(link_canonical).netloc or None) if isinstance(link_canonical, str) else None,
+    )
+
+
+def _clean(value):
+    """pandas missing values (NaN / NA) -> None, numpy scalars -> Python scalars, for sqlite3."""
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value.item() if hasattr(value, "item") else value
+
+
+class PipelineDB:
+    """
+    Thin upsert / query layer over the pipeline's SQLite file.
+    One connection guarded by a lock, so extract01's fetch threads can write through it.
+    """
+
+    def __init__(self, path: str = PIPELINE_DB, text_store_root: str = TEXT_STORE_DIR):
+        self.path = path
+        self.text_store_root = text_store_root
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.con = sqlite3.connect(path, check_same_thread=False)
+        self.con.row_factory = sqlite3.Row
+        self.con.execute("PRAGMA journal_mode = WAL")
+        self.con.execute("PRAGMA synchronous = NORMAL")
+        self.con.executescript(SCHEMA_SQL)
+        self._add_missing_columns("items", ITEM_COLUMNS + DERIVED_COLUMNS)
+        self._add_missing_columns("articles", ARTICLE_COLUMNS)
+        self.con.executescript(VIEW_SQL)
+        self._move_texts_to_store()
+        self._lock = threading.Lock()
+        self._install_rollups()
+
+    def _add_missing_columns(self, table: str, columns) -> None:
+        """Bring a table created by an older version up to date (new columns are TEXT, NULL)."""
+        have = {r["name"] for r in self.con.execute(f"PRAGMA table_info({table})")}
+        for col in columns:
+            if col not in have:
+                self.con.execute(f"ALTER TABLE {table} ADD COLUMN {col} TEXT")
+        self.con.commit()
+
+    def _move_texts_to_store(self) -> None:
+        """Databases from before the text store kept article_text inline: store it, keep the ref."""
+        if "article_text" not in {r["name"] for r in self.con.execute("PRAGMA table_info(articles)")}:
+            return
+        rows = self.con.execute(
+            "SELECT link_canonical, article_text FROM articles WHERE article_text IS NOT NULL AND text_ref IS NULL"
+        ).fetchall()
+        if rows:
+            # Texts are synced to the store before the refs are committed
+            with TextStore(self.text_store_root) as texts:
+                refs = [(texts.put(r["article_text"]), r["link_canonical"]) for r in rows]
+        else:
+            refs = []
+        with self.con:
+            self.con.executemany("UPDATE articles SET text_ref = ? WHERE link_canonical = ?", refs)
+            self.con.execute("ALTER TABLE articles DROP COLUMN article_text")
+        print(f"🗜️  Moved {len(refs)} article texts from {self.path} to the text store {self.text_store_root}")
+
+    def _install_rollups(self) -> None:
+        have = [r["name"] for r in self.con.execute("PRAGMA table_info(item_rollup)")]
+        if have and have != ["key", *ROLLUP_DIMENSIONS, "items"]:
+            self.con.execute("DROP TABLE item_rollup")  # dimensions changed: rebuilt below
+        self.con.executescript(ROLLUP_TABLE_SQL + ROLLUP_TRIGGERS_SQL)
+        # Items written before the derived columns existed
+        stale = self.con.execute(
+            "SELECT id, issue_date, link_canonical FROM items"
+            " WHERE (issue_month IS NULL AND issue_date IS NOT NULL) OR (domain IS NULL AND link_canonical IS NOT NULL)"
+        ).fetchall()
+        if stale:
+            with self.con:
+                self.con.executemany(
+                    f"UPDATE items SET {', '.join(f'{c} = ?' for c in DERIVED_COLUMNS)} WHERE id = ?",
+                    [_derived(r["issue_date"], r["link_canonical"]) + (r["id"],) for r in stale],
+                )
+        # A new (or dropped) rollup table, or a database written without the triggers
+        items, rolled = self.con.execute(
+            "SELECT (SELECT COUNT(*) FROM items), (SELECT COALESCE(SUM(items), 0) FROM item_rollup)"
+        ).fetchone()
+        if items != rolled:
+            self.rebuild_rollups()
+
+    def close(self) -> None:
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- newsletters + items (extract00) ----
+    def replace_newsletter(self, source_file: str, sha256: str, rows: list[dict]) -> None:
+        """Upsert one archive file's items and drop items it no longer produces."""
+        numbers = {r.get("newsletter_number") for r in rows} - {None}
+        dates = {r.get("issue_date") for r in rows} - {None}
+        with self._lock, self.con:
+            self.con.execute(
+                "INSERT INTO newsletters (source_file, newsletter_number, issue_date, sha256, item_count, parsed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(source_file) DO UPDATE SET"
+                " newsletter_number = excluded.newsletter_number, issue_date = excluded.issue_date,"
+                " sha256 = excluded.sha256, item_count = excluded.item_count, parsed_at = excluded.parsed_at",
+                (source_file, _clean(min(numbers)) if numbers else None, min(dates) if dates else None,
+                 sha256, len(rows), time.time()),
+            )
+            ids = [r["id"] for r in rows]
+            self.con.execute(
+                f"DELETE FROM items WHERE source_file = ? AND id NOT IN ({','.join('?' * len(ids))})",
+                [source_file, *ids],
+            )
+            self._upsert_items([{**r, "source_file": source_file} for r in rows])
+
+    def prune_newsletters(self, current_files) -> int:
+        """
+        Drop newsletters whose archive file is no longer in `current_files` (deleted or renamed),
+        together with their items. Returns the number of items removed.
+        """
+        keep = sorted(set(current_files))
+        placeholders = ",".join("?" * len(keep))
+        with self._lock, self.con:
+            removed = self.con.execute(
+                f"DELETE FROM items WHERE source_file IS NOT NULL AND source_file NOT IN ({placeholders})", keep
+            ).rowcount
+            self.con.execute(f"DELETE FROM newsletters WHERE source_file NOT IN ({placeholders})", keep)
+        return removed
+
+    def upsert_items(self, rows) -> int:
+        """Insert or update items by id (e.g. the cleaned items extract01 starts from)."""
+        rows = list(rows)
+        with self._lock, self.con:
+            self._upsert_items(rows)
+        return len(rows)
+
+    def _upsert_items(self, rows: list[dict]) -> None:
+        now = time.time()
+        cols = ITEM_COLUMNS + DERIVED_COLUMNS + ("updated_at",)
+        # Columns a row does not carry (e.g. source_file for cleaned items) keep their stored value
+        self.con.executemany(
+            f"INSERT INTO items ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+            " ON CONFLICT(id) DO UPDATE SET "
+            + ", ".join(f"{c} = COALESCE(excluded.{c}, items.{c})" for c in cols if c != "id"),
+            [
+                values + _derived(values[ITEM_COLUMNS.index("issue_date")], values[ITEM_COLUMNS.index("link_canonical")])
+                + (now,)
+                for values in (
+                    tuple(_clean(r.get(c, r.get("link") if c == "link_canonical" else None)) for c in ITEM_COLUMNS)
+                    for r in rows
+                )
+            ],
+        )
+
+    # ---- articles + attempts (extract01) ----
+    def record_article(self, row: dict, run_id: str | None = None) -> None:
+        """
+        Log the fetch attempt and upsert the article. A failed attempt never overwrites an
+        article that was fetched successfully before.
+        """
+        now = time.time()
+        values = tuple(_clean(row.get(c)) for c in ARTICLE_COLUMNS) + (now,)
+        with self._lock, self.con:
+            self.con.execute(
+                "INSERT INTO fetch_attempts (link_canonical, run_id, status, failure_reason, attempted_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (row["link_canonical"], run_id, row.get("status"), row.get("failure_reason"), now),
+            )
+            self.con.execute(
+                f"INSERT INTO articles ({', '.join(ARTICLE_COLUMNS)}, fetched_at)"
+                f" VALUES ({', '.join('?' * (len(ARTICLE_COLUMNS) + 1))})"
+                " ON CONFLICT(link_canonical) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in ARTICLE_COLUMNS[1:] + ("fetched_at",))
+                + " WHERE excluded.status = 'ok' OR articles.status IS NOT 'ok'",
+                values,
+            )
+
+    # ---- queries ----
+    def newsletter_hashes(self) -> dict[str, str]:
+        return {r["source_file"]: r["sha256"] for r in self.con.execute("SELECT source_file, sha256 FROM newsletters")}
+
+    def merged_frame(self, columns=None, where: str = "", params=(), with_text: bool = False) -> pd.DataFrame:
+        """
+        Items joined to their articles (the items_with_articles view) as a DataFrame. with_text adds
+        article_text, read from the text store by text_ref (which must then be among `columns`).
+        """
+        cols = ", ".join(columns) if columns else "*"
+        sql = f"SELECT {cols} FROM items_with_articles" + (f" WHERE {where}" if where else "")
+        df = pd.read_sql_query(sql, self.con, params=list(params))
+        if with_text:
+            with TextStore(self.text_store_root, readonly=True) as texts:
+                df = attach_text(df, texts)
+        return df
+
+    def counts(self) -> dict:
+        return {
+            t: self.con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            for t in ("newsletters", "items", "articles", "fetch_attempts")
+        }
+
+    # ---- rollups ----
+    def rollup(self, by, where: dict | None = None, columns: str | None = None) -> pd.DataFrame:
+        """
+        Item counts grouped by the ROLLUP_DIMENSIONS in `by`, read from item_rollup.
+        `where` filters on dimensions ({dimension: value or list of values}). `columns` names one
+        more dimension to spread into columns, like .groupby([...]).size().unstack(fill_value=0)
+        (with no `by`, it is simply the grouping). Missing values are kept as their own group.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        where = where or {}
+        unknown = set(by) | set(where) | ({columns} if columns else set())
+        unknown -= set(ROLLUP_DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown rollup dimension(s) {sorted(unknown)}; choose from {ROLLUP_DIMENSIONS}")
+
+        group = by + ([columns] if columns else [])
+        clauses, params = [], []
+        for dim, value in where.items():
+            values = list(value) if isinstance(value, (list, tuple, set, pd.Index, pd.Series)) else [value]
+            clauses.append("(" + " OR ".join(f"{dim} IS ?" for _ in values) + ")")
+            params += [_clean(v) for v in values]
+        sql = (
+            f"SELECT {', '.join(group)}{', ' if group else ''}SUM(items) AS count FROM item_rollup"
+            + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+            + (f" GROUP BY {', '.join(group)}" if group else "")
+            + " HAVING SUM(items) > 0"
+            + (f" ORDER BY {', '.join(group)}" if group else "")
+        )
+        df = pd.read_sql_query(sql, self.con, params=params)
+        if columns and by:
+            df = df.set_index(group)["count"].unstack(columns, fill_value=0)
+        return df
+
+    def rebuild_rollups(self) -> None:
+        """Recompute item_rollup from items + articles (drops cells that have fallen to zero)."""
+        with self._lock, self.con:
+            for statement in ROLLUP_REBUILD_SQL.split(";\n"):
+                self.con.execute(statement)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Print an item-count rollup from the pipeline store.")
+    ap.add_argument("by", nargs="*", help=f"dimensions to group by: {', '.join(ROLLUP_DIMENSIONS)}")
+    ap.add_argument("--columns", help="dimension to spread into columns (e.g. status)")
+    ap.add_argument("--where", action="append", default=[], metavar="DIM=VALUE",
+                    help="keep rows with this value (repeat a dimension to allow several values)")
+    ap.add_argument("--db", default=PIPELINE_DB)
+    ap.add_argument("--rebuild", action="store_true", help="recompute the rollup from items + articles first")
+    args = ap.parse_args(argv)
+
+    where = {}
+    for clause in args.where:
+        dim, _, value = clause.partition("=")
+        where.setdefault(dim, []).append(value)
+    with PipelineDB(args.db) as db:
+        if args.rebuild:
+            db.rebuild_rollups()
+        t0 = time.perf_counter()
+        df = db.rollup(args.by, where=where, columns=args.columns)
+        elapsed = time.perf_counter() - t0
+    with pd.option_context("display.max_rows", 200, "display.width", 200):
+        print(df)
+    print(f"📊 {len(df)} rows in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
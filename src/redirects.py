@@ -0,0 +1,125 @@
+# Redirect-aware link resolution for extract01_full_article.
+# canonical_url() only rewrites strings, so a shortener link, a tracking redirect and the http://,
+# https:// and www. variants of the same page all look like different articles and are downloaded
+# and extracted separately. A RedirectMap records, per link_canonical, the redirect chain and final
+# URL (from a HEAD request, the HTTP cache, or any fetch that followed redirects) and keeps it
+# across runs in a small JSON file. collapse_links() then maps every link to one representative
+# per final page, so each distinct article is fetched once and fanned back out to every item.
+# Only links on known shortener / tracking hosts (REDIRECTOR_HOSTS) are resolved ahead of the fetch;
+# every other link's final URL comes from the redirect history of its own fetch.
+
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse, urlunparse
+
+from urls import canonical_url
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+REDIRECTS_JSON = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/redirects.json"
+RESOLVE_TTL = 30 * 24 * 3600   # re-resolve a link after 30 days
+FAILED_TTL = 24 * 3600         # links that could not be resolved are retried the next day
+# Hosts whose links only ever redirect elsewhere (subdomains included)
+REDIRECTOR_HOSTS = (
+    "bit.ly", "t.co", "ow.ly", "buff.ly", "lnkd.in", "tinyurl.com", "goo.gl", "is.gd", "t.ly",
+    "tiny.cc", "rebrand.ly", "dlvr.it", "trib.al", "eepurl.com", "mailchi.mp", "list-manage.com",
+    "safelinks.protection.outlook.com", "urldefense.com", "links.govdelivery.com",
+)
+
+
+def equivalence_key(url: str) -> str:
+    """
+    Key under which two URLs are taken to be the same page: the canonical URL with the scheme
+    and a leading "www." ignored (sites serve both, and usually redirect one to the other).
+    """
+    p = urlparse(canonical_url(url))
+    host = p.netloc[4:] if p.netloc.startswith("www.") else p.netloc
+    return urlunparse(("", host, p.path, "", p.query, ""))
+
+
+def is_redirector(url: str, hosts=REDIRECTOR_HOSTS) -> bool:
+    """True for links on a shortener / tracking host, whose target is worth resolving before fetching."""
+    host = urlparse(url).netloc.lower().split(":", 1)[0]
+    return any(host == h or host.endswith("." + h) for h in hosts)
+
+
+class RedirectMap:
+    """
+    link_canonical -> {"final": url, "chain": [hop urls], "status": int | None, "resolved_at": ts}.
+    Thread-safe; save() writes the whole map atomically.
+    """
+
+    def __init__(self, path: str = REDIRECTS_JSON):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, link: str) -> dict | None:
+        return self._entries.get(link)
+
+    def is_fresh(self, link: str, now: float | None = None) -> bool:
+        entry = self._entries.get(link)
+        if not entry:
+            return False
+        ttl = RESOLVE_TTL if entry.get("final") else FAILED_TTL
+        return (now or time.time()) - entry["resolved_at"] < ttl
+
+    def record(self, link: str, final: str | None, chain=(), status: int | None = None) -> None:
+        """Store where `link` ends up; `final` None marks a link that could not be resolved."""
+        entry = {
+            "final": canonical_url(final) if final else None,
+            "chain": [u for u in chain if u],
+            "status": status,
+            "resolved_at": time.time(),
+        }
+        with self._lock:
+            self._entries[link] = entry
+            self._dirty = True
+
+    def final_url(self, link: str) -> str:
+        """The canonical final URL of `link`, or `link` itself while it is unresolved."""
+        entry = self._entries.get(link)
+        return (entry or {}).get("final") or link
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=0, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+def collapse_links(links, redirect_map: RedirectMap | None, prefer=()) -> dict[str, str]:
+    """
+    {link: representative link} for every link, grouping links whose final URLs share an
+    equivalence_key. The representative is a link in `prefer` (e.g. already fetched), else the
+    link that already is the final URL, else the first link of the group.
+    """
+    prefer = set(prefer)
+    groups = {}
+    for link in links:
+        final = redirect_map.final_url(link) if redirect_map else link
+        groups.setdefault(equivalence_key(final), []).append((link, final))
+
+    rep = {}
+    for members in groups.values():
+        chosen = next((l for l, _ in members if l in prefer), None) \
+            or next((l for l, f in members if l == f), None) \
+            or members[0][0]
+        for link, _ in members:
+            rep[link] = chosen
+    return rep
@@ -0,0 +1,374 @@
+# Record / replay for extract01_full_article, so the fetcher can be exercised offline and reproducibly.
+#
+# Record: with RECORD_DIR set in extract01_full_article, every response fetch_html sees is saved
+#   (status, headers, body and the redirect chain) in a content-addressed directory. Bodies the
+#   fetcher rejected (non-HTML, too large) keep only the bytes it read, the body's full size and the
+#   failure reason; the server pads them back out so the replay is rejected the same way.
+# Replay: serve those recordings from a local HTTP server and point REPLAY_URL at it. Each host can be
+#   given latency, jitter, bandwidth and error rates (404s, 429s with Retry-After, timeouts), so
+#   concurrency, retry and caching behaviour can be load-tested at the scale of the full link list.
+#   With --synthesize, links that were never recorded get a generated article page instead of a 404.
+#
+# Usage:
+#   python src/replay.py serve --recordings /path/to/recordings --port 8765 --profile profile.json
+#   python src/replay.py stats --recordings /path/to/recordings
+#
+# profile.json (every key optional; "hosts" entries override "default" for that host):
+#   {"seed": 1,
+#    "default": {"latency": 0.05, "jitter": 0.02, "bandwidth": 500000},
+#    "hosts": {"www.gov.uk": {"latency": 0.4, "error_rates": {"429": 0.05, "timeout": 0.01}}}}
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+from http_cache import HttpCache
+
+# Headers that describe the original transfer, not the recorded body
+HOP_HEADERS = {"connection", "content-encoding", "content-length", "keep-alive", "transfer-encoding"}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+# -----------------------------
+# REPLAY ADDRESSES
+# -----------------------------
+def replay_url(base: str, url: str) -> str:
+    """Address of `url` on the replay server at `base` (e.g. http://127.0.0.1:8765)."""
+    return f"{base.rstrip('/')}/?url={quote(url, safe='')}"
+
+
+def original_url(address: str) -> str:
+    """Inverse of replay_url; anything that is not a replay address comes back unchanged."""
+    urls = parse_qs(urlparse(address).query).get("url")
+    return urls[0] if urls else address
+
+
+# -----------------------------
+# RECORDINGS
+# -----------------------------
+@dataclass
+class Recording:
+    url: str
+    status: int
+    headers: dict = field(default_factory=dict)
+    final_url: str = ""
+    # Remaining redirect hops from this URL: [{"url", "status", "location"}, ...]
+    history: list = field(default_factory=list)
+    elapsed: float = 0.0
+    recorded_at: float = 0.0
+    failure_reason: str | None = None  # why fetch_html rejected the response, if it did
+    body_size: int | None = None       # full body length when `body` holds only its start
+    body: bytes = b""
+
+
+class Recordings:
+    """
+    Recorded responses on disk, one per requested URL, in the same layout as HttpCache:
+    <root>/<aa>/<sha256>.json (metadata) and <root>/<aa>/<sha256>.body (raw bytes).
+    Every hop of a redirect chain is stored under its own URL, so the chain replays hop by hop.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        k = HttpCache.key(url)
+        base = os.path.join(self.root, k[:2], k)
+        return base + ".json", base + ".body"
+
+    def put(self, rec: Recording) -> None:
+        meta_path, body_path = self._paths(rec.url)
+        meta = {k: v for k, v in rec.__dict__.items() if k != "body"}
+        with self._lock:
+            HttpCache._atomic_write(body_path, rec.body)
+            HttpCache._atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def get(self, url: str) -> Recording | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return Recording(body=body, **meta)
+
+    def record(self, url: str, resp, body: bytes | None = None, failure_reason: str | None = None,
+               body_size: int | None = None) -> None:
+        """
+        Save a requests.Response for `url`, including each redirect hop that led to it.
+        Pass `body` when the response was streamed (resp.content is then no longer available),
+        with `body_size` when it is only the start of a longer body.
+        """
+        body = resp.content if body is None else body
+        hops = [
+            {"url": h.url, "status": h.status_code, "location": h.headers.get("Location", "")}
+            for h in resp.history
+        ]
+        chain = [url] + [h["url"] for h in hops[1:]]
+        now = time.time()
+        for i, hop_url in enumerate(chain):
+            self.put(Recording(
+                url=hop_url,
+                status=resp.status_code,
+                headers=dict(resp.headers),
+                final_url=resp.url,
+                history=hops[i:],
+                elapsed=resp.elapsed.total_seconds(),
+                recorded_at=now,
+                failure_reason=failure_reason,
+                body_size=body_size,
+                body=body,
+            ))
+        if resp.history and resp.url not in chain:
+            self.put(Recording(
+                url=resp.url,
+                status=resp.status_code,
+                headers=dict(resp.headers),
+                final_url=resp.url,
+                elapsed=resp.elapsed.total_seconds(),
+                recorded_at=now,
+                failure_reason=failure_reason,
+                body_size=body_size,
+                body=body,
+            ))
+
+    def __iter__(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in sorted(os.listdir(self.root)):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in sorted(os.listdir(shard_dir)):
+                if name.endswith(".json"):
+                    with open(os.path.join(shard_dir, name), "r", encoding="utf-8") as f:
+                        yield json.load(f)
+
+
+# -----------------------------
+# HOST PROFILES (latency, bandwidth, faults)
+# -----------------------------
+@dataclass
+class HostProfile:
+    latency: float = 0.0          # seconds before the status line is sent
+    jitter: float = 0.0           # +/- uniform seconds added to latency
+    bandwidth: float | None = None  # body bytes per second (None = unlimited)
+    # Probability per request of each fault: "404", "429", "500", ..., or "timeout"
+    error_rates: dict = field(default_factory=dict)
+    retry_after: int = 5          # Retry-After seconds sent with injected 429s
+    timeout_hold: float = 60.0    # how long an injected timeout holds the connection open
+
+
+def load_profiles(path: str | None) -> tuple[HostProfile, dict, int | None]:
+    """(default profile, {host: profile}, seed) from a profile JSON file (see top of file)."""
+    if not path:
+        return HostProfile(), {}, None
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    base = cfg.get("default", {})
+    default = HostProfile(**base)
+    hosts = {host: HostProfile(**{**base, **p}) for host, p in cfg.get("hosts", {}).items()}
+    return default, hosts, cfg.get("seed")
+
+
+# -----------------------------
+# SYNTHETIC PAGES
+# -----------------------------
+WORDS = ("school", "pupils", "teachers", "funding", "report", "education", "policy", "research",
+         "attainment", "curriculum", "evidence", "trust", "department", "support", "training")
+
+
+def synthetic_page(url: str) -> bytes:
+    """A deterministic article-like page for `url`, long enough to pass the main-text heuristic."""
+    rnd = random.Random(hashlib.sha256(url.encode("utf-8")).digest())
+    paras = [
+        " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(40, 90))).capitalize() + "."
+        for _ in range(rnd.randint(3, 8))
+    ]
+    title = " ".join(rnd.choice(WORDS) for _ in range(5)).title()
+    body = "".join(f"<p>{p}</p>" for p in paras)
+    return (f"<html><head><title>{title}</title></head><body><nav>Home | News</nav>"
+            f"<article><h1>{title}</h1>{body}</article></body></html>").encode("utf-8")
+
+
+# -----------------------------
+# SERVER
+# -----------------------------
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, recordings: Recordings, profile_path: str | None = None,
+                 synthesize: bool = False):
+        super().__init__(address, ReplayHandler)
+        self.recordings = recordings
+        self.default_profile, self.host_profiles, seed = load_profiles(profile_path)
+        self.synthesize = synthesize
+        self.rnd = random.Random(seed)
+        self.stats = Counter()  # (host, outcome) -> requests
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def profile(self, host: str) -> HostProfile:
+        return self.host_profiles.get(host, self.default_profile)
+
+    def draw(self, profile: HostProfile) -> tuple[str | None, float]:
+        """(injected fault or None, latency) for one request; one shared seeded RNG."""
+        with self._lock:
+            fault = None
+            roll = self.rnd.random()
+            for name, rate in sorted(profile.error_rates.items()):
+                if roll < rate:
+                    fault = str(name)
+                    break
+                roll -= rate
+            latency = max(0.0, profile.latency + self.rnd.uniform(-profile.jitter, profile.jitter))
+        return fault, latency
+
+    def count(self, host: str, outcome: str) -> None:
+        with self._lock:
+            self.stats[(host, outcome)] += 1
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return  # the client dropped the connection, e.g. after rejecting a body as too large
+        super().handle_error(request, client_address)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server: ReplayServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # one line per request would swamp a load test; see server.stats instead
+
+    def do_GET(self):
+        url = original_url(self.path)
+        host = urlparse(url).netloc
+        profile = self.server.profile(host)
+        fault, latency = self.server.draw(profile)
+        time.sleep(latency)
+
+        if fault == "timeout":
+            self.server.count(host, "timeout")
+            time.sleep(profile.timeout_hold)
+            self.close_connection = True
+            return
+        if fault:
+            self.server.count(host, fault)
+            extra = {"Retry-After": str(profile.retry_after)} if fault == "429" else {}
+            return self._send(int(fault), extra, b"", profile)
+
+        rec = self.server.recordings.get(url)
+        if rec is None:
+            if self.server.synthesize:
+                self.server.count(host, "synthetic")
+                return self._send(200, {"Content-Type": "text/html; charset=utf-8"}, synthetic_page(url), profile)
+            self.server.count(host, "miss")
+            return self._send(404, {"X-Replay-Miss": "1"}, b"", profile)
+
+        if rec.history and rec.history[0]["status"] in REDIRECT_STATUSES:
+            hop = rec.history[0]
+            next_url = rec.history[1]["url"] if len(rec.history) > 1 else rec.final_url
+            self.server.count(host, f"redirect_{hop['status']}")
+            return self._send(hop["status"], {"Location": replay_url(self.server.base_url, next_url)}, b"", profile)
+
+        self.server.count(host, str(rec.status))
+        headers = {k: v for k, v in rec.headers.items() if k.lower() not in HOP_HEADERS}
+        self._send(rec.status, headers, rec.body, profile, size=rec.body_size)
+
+    def _send(self, status: int, headers: dict, body: bytes, profile: HostProfile,
+              size: int | None = None) -> None:
+        """Send a response; with `size` beyond len(body), the body is padded out with spaces."""
+        size = max(size or 0, len(body))
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        # 16 KB chunks, paced to the host's bandwidth when it has one
+        chunk = 16 * 1024
+        try:
+            for i in range(0, size, chunk):
+                piece = body[i:i + chunk]
+                piece += b" " * (min(chunk, size - i) - len(piece))
+                self.wfile.write(piece)
+                if profile.bandwidth:
+                    time.sleep(len(piece) / profile.bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # the client gave up on the body (e.g. too large)
+
+
+def serve(recordings_dir: str, host: str = "127.0.0.1", port: int = 8765,
+          profile_path: str | None = None, synthesize: bool = False) -> ReplayServer:
+    """Start a replay server in a background thread and return it (call .shutdown() to stop)."""
+    server = ReplayServer((host, port), Recordings(recordings_dir), profile_path, synthesize)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Record/replay server for extract01_full_article.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="serve recordings over HTTP")
+    s.add_argument("--recordings", required=True)
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8765)
+    s.add_argument("--profile", help="JSON file with per-host latency / bandwidth / error rates")
+    s.add_argument("--synthesize", action="store_true", help="generate pages for unrecorded links")
+    st = sub.add_parser("stats", help="summarise a recordings directory")
+    st.add_argument("--recordings", required=True)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "stats":
+        by_status = Counter()
+        rejected = Counter()
+        hosts = Counter()
+        for meta in Recordings(args.recordings):
+            by_status[meta["status"]] += 1
+            if meta["status"] == 200 and meta.get("failure_reason"):
+                rejected[meta["failure_reason"]] += 1
+            hosts[urlparse(meta["url"]).netloc] += 1
+        print(f"🎞️  {sum(by_status.values())} recordings across {len(hosts)} hosts")
+        for status, n in sorted(by_status.items()):
+            print(f"   HTTP {status}: {n}")
+        for reason, n in sorted(rejected.items()):
+            print(f"   HTTP 200 rejected as {reason}: {n}")
+        for host, n in hosts.most_common(10):
+            print(f"   {host}: {n}")
+        return 0
+
+    server = serve(args.recordings, args.host, args.port, args.profile, args.synthesize)
+    print(f"🎞️  Replaying {args.recordings} on {server.base_url} "
+          f"(set REPLAY_URL = \"{server.base_url}\" in extract01_full_article)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    print("📊 Requests served:")
+    for (host, outcome), n in sorted(server.stats.items()):
+        print(f"   {host:<40}{outcome:<16}{n}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+# Streaming, typed table output for the pipeline stages.
+# Rows are buffered into small batches and appended to the output as they are produced, either as
+# CSV (the format the notebooks have always read) or as Parquet with real column types:
+# categorical theme/subtheme/domain/status columns, nullable integers and a zstd-compressed
+# article_text column. read_table() loads either format back, optionally only selected columns.
+# Parquet needs pyarrow (pip install pyarrow); CSV needs nothing extra.
+
+import os
+
+import pandas as pd
+
+BATCH_SIZE = 500
+
+# Column types. "category" -> dictionary-encoded in Parquet; "boolean" -> nullable bool; unknown columns are plain strings.
+ITEM_SCHEMA = {
+    "id": "string",
+    "newsletter_number": "Int64",
+    "issue_date": "string",
+    "theme": "category",
+    "subtheme": "category",
+    "title": "string",
+    "description": "string",
+    "link": "string",
+}
+
+ARTICLE_SCHEMA = {
+    "article_id": "string",
+    "link_canonical": "string",
+    "domain": "category",
+    "article_title": "string",
+    "article_text": "string",
+    "text_ref": "string",
+    "status": "category",
+    "failure_reason": "category",
+}
+
+# Large text columns get a stronger codec than the rest of the file
+COMPRESSED_COLUMNS = {"article_text": "zstd"}
+DEFAULT_COMPRESSION = "snappy"
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def with_format(path: str, fmt: str) -> str:
+    """Swap a path's extension for the given output format ("csv" or "parquet")."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; choose from {sorted(FORMATS)}")
+    return os.path.splitext(path)[0] + FORMATS[fmt]
+
+
+def format_of(path: str) -> str:
+    return "parquet" if path.endswith(".parquet") else "csv"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def typed_frame(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """Cast the columns named in `schema` to their declared pandas dtypes."""
+    df = df.copy()
+    for col in df.columns:
+        kind = schema.get(col, "string")
+        if kind == "Int64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        elif kind == "category":
+            df[col] = df[col].astype("string").astype("category")
+        elif kind == "boolean":
+            df[col] = df[col].astype("boolean")
+        else:
+            df[col] = df[col].astype("string")
+    return df
+
+
+class RowWriter:
+    """
+    Append rows to a CSV or Parquet file in batches of `batch_size`.
+
+    Output goes to `<path>.partial` and is moved into place on close(), so readers never see a
+    half-written table; if the writer is closed by an exception the partial file is removed.
+    `columns` fixes the column order; when None it is taken from the first frame written.
+    """
+
+    def __init__(self, path: str, columns=None, schema=None, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.fmt = format_of(path)
+        self.columns = list(columns) if columns is not None else None
+        self.schema = schema or {}
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._batch = []
+        self._partial = path + ".partial"
+        self._csv_header_done = False
+        self._parquet = None
+
+        if self.fmt == "parquet":
+            _require_pyarrow()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+    # ---- public API ----
+    def write(self, row: dict) -> None:
+        self._batch.append(row)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, rows) -> None:
+        for row in rows:
+            self.write(row)
+
+    def write_frame(self, df: pd.DataFrame) -> None:
+        self.flush()
+        if self.columns is None:
+            self.columns = list(df.columns)
+        self._write_frame(df)
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        if self.columns is None:
+            self.columns = list(self._batch[0])
+        df = pd.DataFrame(self._batch, columns=self.columns)
+        self._batch = []
+        self._write_frame(df)
+
+    def close(self) -> None:
+        self.flush()
+        if self.columns is None:
+            self.columns = list(self.schema)
+        if self.fmt == "parquet":
+            if self._parquet is None:
+                # No rows at all: still produce a valid, empty, typed file
+                self._write_frame(pd.DataFrame(columns=self.columns))
+            self._parquet.close()
+        elif not self._csv_header_done:
+            pd.DataFrame(columns=self.columns).to_csv(self._partial, index=False)
+        os.replace(self._partial, self.path)
+
+    def abort(self) -> None:
+        self._batch = []
+        if self._parquet is not None:
+            self._parquet.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    # ---- backends ----
+    def _write_frame(self, df: pd.DataFrame) -> None:
+        df = typed_frame(df[self.columns], self.schema)
+        if self.fmt == "csv":
+            df.to_csv(self._partial, mode="a", header=not self._csv_header_done, index=False)
+            self._csv_header_done = True
+        else:
+            self._write_parquet(df)
+        self.rows_written += len(df)
+
+    def _arrow_schema(self):
+        pa, _ = _require_pyarrow()
+        types = {"Int64": pa.int64(), "boolean": pa.bool_(), "category": pa.dictionary(pa.int32(), pa.string())}
+        return pa.schema([
+            (col, types.get(self.schema.get(col, "string"), pa.string()))
+            for col in self.columns
+        ])
+
+    def _write_parquet(self, df: pd.DataFrame) -> None:
+        pa, pq = _require_pyarrow()
+        schema = self._arrow_schema()
+        if self._parquet is None:
+            compression = {col: COMPRESSED_COLUMNS.get(col, DEFAULT_COMPRESSION) for col in self.columns}
+            self._parquet = pq.ParquetWriter(self._partial, schema, compression=compression)
+        self._parquet.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+
+
+def read_table(path: str, columns=None, schema=None) -> pd.DataFrame:
+    """
+    Load a table written by RowWriter (or any CSV), reading only `columns` if given.
+    CSV columns are parsed with the declared dtypes; only empty cells count as missing.
+    """
+    if format_of(path) == "parquet":
+        return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
+
+    schema = schema or {}
+    header = pd.read_csv(path, nrows=0).columns
+    wanted = [c for c in header if columns is None or c in columns]
+    dtypes = {c: schema.get(c, "string") for c in wanted}
+    df = pd.read_csv(path, usecols=wanted, dtype=dtypes, keep_default_na=False, na_values=[""])
+    return df[list(columns)] if columns is not None else df
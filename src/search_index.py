@@ -0,0 +1,270 @@
+# Full-text search over newsletter items and their scraped articles.
+# Builds a SQLite FTS5 index (title, description, article title + text) from the outputs of
+# extract00_newsletters / extract01_full_article, with the filter columns (theme, subtheme,
+# newsletter number, issue date, domain) stored alongside. Rebuilding is incremental: rows are keyed
+# by item id and only re-indexed when their content hash changes; rows that disappeared are removed.
+# Results are bm25-ranked (title > description > article text) with highlighted snippets.
+#
+# Usage:
+#   python src/search_index.py build
+#   python src/search_index.py query "teacher retention" --domain nfer.ac.uk --year 2024
+#   python src/search_index.py query "\"tutoring programme\" AND funding" --theme "Thematic roundup" -n 5
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from row_writer import ARTICLE_SCHEMA, ITEM_SCHEMA, read_table, with_format
+from text_store import attach_text
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+NEWSLETTER_ITEMS_CSV = "/workspaces/ERP_Newsletter/data/data01_newsletter_items/newsletter_items.csv"
+MERGED_OUTPUT_CSV = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/newsletter_full_articles_with_items.csv"
+INPUT_FORMAT = "csv"  # format the stages wrote ("csv" or "parquet")
+INDEX_DB = "/workspaces/ERP_Newsletter/data/data05_search/search_index.sqlite"
+
+# bm25 column weights, in FTS column order
+BM25_WEIGHTS = (10.0, 4.0, 3.0, 1.0)
+SNIPPET_TOKENS = 16
+# sqlite3.OperationalError messages that mean the query text itself is malformed
+FTS_QUERY_ERRORS = ("fts5: syntax error", "unterminated string", "unknown special query", "no such column")
+
+INDEXED_COLUMNS = ("title", "description", "article_title", "article_text")
+FILTER_COLUMNS = ("newsletter_number", "issue_date", "theme", "subtheme", "link", "domain")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS docs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    content_hash TEXT NOT NULL,
+    newsletter_number INTEGER,
+    issue_date TEXT,
+    issue_date_iso TEXT,
+    theme TEXT,
+    subtheme TEXT,
+    link TEXT,
+    domain TEXT
+);
+CREATE INDEX IF NOT EXISTS docs_issue_date_iso ON docs(issue_date_iso);
+CREATE INDEX IF NOT EXISTS docs_domain ON docs(domain);
+CREATE INDEX IF NOT EXISTS docs_newsletter_number ON docs(newsletter_number);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, description, article_title, article_text,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+
+# -----------------------------
+# INDEX
+# -----------------------------
+def connect(path: str = INDEX_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = sqlite3.connect(path)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode = WAL")
+    con.executescript(SCHEMA_SQL)
+    return con
+
+
+def load_rows(items_path: str | None = None, merged_path: str | None = None) -> pd.DataFrame:
+    """
+    Items to index: the merged items + articles table when extract01 has run, else the items alone.
+    Missing columns come back empty, so both inputs look the same to the indexer.
+    """
+    items_path = items_path or with_format(NEWSLETTER_ITEMS_CSV, INPUT_FORMAT)
+    merged_path = merged_path or with_format(MERGED_OUTPUT_CSV, INPUT_FORMAT)
+    path = merged_path if os.path.exists(merged_path) else items_path
+    df = attach_text(read_table(path, schema={**ITEM_SCHEMA, **ARTICLE_SCHEMA}))
+    for col in ("id",) + INDEXED_COLUMNS + FILTER_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    if df["domain"].isna().all() and df["link"].notna().any():
+        df["domain"] = df["link"].fillna("").map(lambda u: urlparse(u).netloc)
+    df = df.astype(object).where(df.notna(), None)
+    # Items without a stable id (older cleaned files) are keyed by their content
+    missing = df["id"].isna()
+    if missing.any():
+        df.loc[missing, "id"] = [
+            hashlib.sha1(f"{r['newsletter_number']}|{r['link']}|{r['title']}".encode("utf-8")).hexdigest()
+            for _, r in df[missing].iterrows()
+        ]
+    return df.drop_duplicates("id", keep="last")
+
+
+def _content_hash(row: dict) -> str:
+    payload = [row.get(c) for c in INDEXED_COLUMNS + FILTER_COLUMNS]
+    return hashlib.sha1(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+
+
+def _iso_date(value) -> str | None:
+    if not value:
+        return None
+    d = pd.to_datetime(value, dayfirst=True, errors="coerce")
+    return None if pd.isna(d) else d.date().isoformat()
+
+
+def build(con: sqlite3.Connection, df: pd.DataFrame) -> dict:
+    """Bring the index in line with `df`. Returns counts of added / updated / removed / unchanged rows."""
+    known = {r["id"]: (r["rowid"], r["content_hash"]) for r in con.execute("SELECT rowid, id, content_hash FROM docs")}
+    counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    seen = set()
+
+    with con:
+        for row in df.to_dict("records"):
+            doc_id = row["id"]
+            seen.add(doc_id)
+            h = _content_hash(row)
+            prev = known.get(doc_id)
+            if prev and prev[1] == h:
+                counts["unchanged"] += 1
+                continue
+            if prev:
+                con.execute("DELETE FROM docs_fts WHERE rowid = ?", (prev[0],))
+                con.execute("DELETE FROM docs WHERE rowid = ?", (prev[0],))
+                counts["updated"] += 1
+            else:
+                counts["added"] += 1
+            nn = row["newsletter_number"]
+            cur = con.execute(
+                "INSERT INTO docs (id, content_hash, newsletter_number, issue_date, issue_date_iso,"
+                " theme, subtheme, link, domain) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (doc_id, h, int(nn) if nn is not None else None, row["issue_date"], _iso_date(row["issue_date"]),
+                 row["theme"], row["subtheme"], row["link"], row["domain"]),
+            )
+            con.execute(
+                "INSERT INTO docs_fts (rowid, title, description, article_title, article_text) VALUES (?, ?, ?, ?, ?)",
+                (cur.lastrowid, *(row[c] or "" for c in INDEXED_COLUMNS)),
+            )
+
+        gone = [(rowid,) for doc_id, (rowid, _) in known.items() if doc_id not in seen]
+        con.executemany("DELETE FROM docs_fts WHERE rowid = ?", gone)
+        con.executemany("DELETE FROM docs WHERE rowid = ?", gone)
+        counts["removed"] = len(gone)
+
+    if counts["added"] or counts["updated"] or counts["removed"]:
+        con.execute("INSERT INTO docs_fts (docs_fts) VALUES ('optimize')")
+        con.commit()
+    return counts
+
+
+# -----------------------------
+# QUERY
+# -----------------------------
+def search(con: sqlite3.Connection, query: str, theme: str | None = None, subtheme: str | None = None,
+           newsletter_number: int | None = None, date_from: str | None = None, date_to: str | None = None,
+           domain: str | None = None, limit: int = 20) -> list[dict]:
+    """
+    Ranked matches for an FTS5 query ("teacher retention", "\"tutoring programme\" OR NTP", "retent*").
+    Filters are exact (theme, subtheme, newsletter_number), a host suffix (domain) or an inclusive
+    ISO date range (date_from / date_to, e.g. "2024-01-01"). Lower score = better match.
+    Raises ValueError when `query` is not valid FTS5 query syntax.
+    """
+    where = ["docs_fts MATCH ?"]
+    params = [query]
+    if theme:
+        where.append("d.theme = ? COLLATE NOCASE")
+        params.append(theme)
+    if subtheme:
+        where.append("d.subtheme = ? COLLATE NOCASE")
+        params.append(subtheme)
+    if newsletter_number is not None:
+        where.append("d.newsletter_number = ?")
+        params.append(int(newsletter_number))
+    if date_from:
+        where.append("d.issue_date_iso >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("d.issue_date_iso <= ?")
+        params.append(date_to)
+    if domain:
+        where.append("(d.domain = ? OR d.domain LIKE ?)")
+        params += [domain, f"%.{domain}"]
+
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    sql = f"""
+        SELECT d.id, d.newsletter_number, d.issue_date, d.theme, d.subtheme, d.link, d.domain,
+               docs_fts.title AS title,
+               bm25(docs_fts, {weights}) AS score,
+               snippet(docs_fts, 1, '[', ']', '…', {SNIPPET_TOKENS}) AS description_snippet,
+               snippet(docs_fts, 3, '[', ']', '…', {SNIPPET_TOKENS}) AS article_snippet
+        FROM docs_fts JOIN docs d ON d.rowid = docs_fts.rowid
+        WHERE {' AND '.join(where)}
+        ORDER BY score
+        LIMIT ?
+    """
+    try:
+        return [dict(r) for r in con.execute(sql, params + [limit])]
+    except sqlite3.OperationalError as e:
+        # Malformed query text: unbalanced quotes or brackets, a bare AND / OR / NOT, an unknown column
+        if str(e).startswith(FTS_QUERY_ERRORS):
+            raise ValueError(f"Invalid search query {query!r}: {e}") from e
+        raise
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Full-text search over newsletter items and articles.")
+    ap.add_argument("--db", default=INDEX_DB)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="create or update the index from the stage outputs")
+    b.add_argument("--items")
+    b.add_argument("--merged")
+    q = sub.add_parser("query", help="search the index")
+    q.add_argument("query")
+    q.add_argument("--theme")
+    q.add_argument("--subtheme")
+    q.add_argument("--newsletter", type=int)
+    q.add_argument("--year", type=int)
+    q.add_argument("--from", dest="date_from")
+    q.add_argument("--to", dest="date_to")
+    q.add_argument("--domain")
+    q.add_argument("-n", "--limit", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    con = connect(args.db)
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        counts = build(con, load_rows(args.items, args.merged))
+        total = con.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        print(f"🔎 Index {args.db}: {total} docs ({', '.join(f'{k} {v}' for k, v in counts.items())}) "
+              f"in {time.perf_counter() - t0:.2f}s")
+        return 0
+
+    date_from, date_to = args.date_from, args.date_to
+    if args.year:
+        date_from, date_to = f"{args.year}-01-01", f"{args.year}-12-31"
+    t0 = time.perf_counter()
+    try:
+        results = search(con, args.query, theme=args.theme, subtheme=args.subtheme,
+                         newsletter_number=args.newsletter, date_from=date_from, date_to=date_to,
+                         domain=args.domain, limit=args.limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        print('   Put phrases in double quotes ("teacher pay") and use AND / OR / NOT between terms.')
+        return 2
+    ms = (time.perf_counter() - t0) * 1000
+    for r in results:
+        print(f"#{r['newsletter_number']} {r['issue_date']} | {r['theme']} / {r['subtheme']} | {r['domain']}")
+        print(f"   {r['title']}  ({r['score']:.2f})")
+        snippet = r["article_snippet"] if "[" in (r["article_snippet"] or "") else r["description_snippet"]
+        if snippet:
+            print(f"   {snippet}")
+        print(f"   {r['link']}")
+    print(f"⏱️  {len(results)} results in {ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
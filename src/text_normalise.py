@@ -0,0 +1,219 @@
+# Text normalisation stage for newsletter items and scraped articles.
+# The same cleanup notebook 0's clean_series does (mojibake repair, NFKC, whitespace collapse), run
+# while the stages write their rows instead of as a row-by-row .apply over the finished table:
+#   - each distinct value is normalised once and the result reused (themes, subthemes and repeated
+#     titles appear on hundreds of rows), via a bounded memo shared across batches
+#   - long article texts are split at whitespace into chunks normalised on a process pool
+# Mojibake repair uses ftfy when it is installed (pip install ftfy); without it only the common
+# UTF-8-read-as-cp1252/Mac-Roman artefacts in REPLACEMENTS are fixed.
+#
+# Usage (normalise an existing table in place of notebook 0's clean_series pass):
+#   python src/text_normalise.py input.csv output.csv --columns title description
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    from ftfy import fix_text
+except ImportError:  # optional: fall back to the fixed replacement table
+    fix_text = None
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+ITEM_TEXT_COLUMNS = ("theme", "subtheme", "title", "description")
+ARTICLE_TEXT_COLUMNS = ("article_title", "article_text")
+
+LONG_TEXT_CHARS = 20_000    # texts longer than this are chunked onto the process pool
+CHUNK_CHARS = 8_000         # target chunk size (cut at the next whitespace)
+MEMO_MAX_CHARS = 2_000      # only values up to this length are memoised
+MEMO_MAX_ENTRIES = 100_000
+WORKERS = os.cpu_count() or 1
+
+# Same table as notebook 0: the artefacts seen in the archive
+REPLACEMENTS = {
+    "Â ": " ", "Â": "",
+    "‚Äì": "–", "‚Äî": "—",
+    "‚Äô": "’", "‚Äò": "‘",
+    "‚Äú": "“", "‚Äù": "”",
+    "â€“": "–", "â€”": "—",
+    "â€˜": "‘", "â€™": "’",
+    "â€œ": "“", "â€\x9d": "”",
+    "â€¢": "•", "â€¦": "…",
+}
+_REPL_RE = re.compile("|".join(re.escape(k) for k in sorted(REPLACEMENTS, key=len, reverse=True)))
+_WS_RE = re.compile(r"\s+")
+
+
+# -----------------------------
+# ONE VALUE
+# -----------------------------
+def normalise_text(text: str) -> str:
+    """Repair mojibake, NFKC-normalise, collapse whitespace runs to one space and strip."""
+    if fix_text is not None:
+        text = fix_text(text)
+    # Before NFKC, which would fold the "™" of "â€™" into "TM"
+    text = _REPL_RE.sub(lambda m: REPLACEMENTS[m.group(0)], text)
+    text = unicodedata.normalize("NFKC", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def split_chunks(text: str, size: int = CHUNK_CHARS) -> list[str]:
+    """
+    Cut `text` into pieces of about `size` characters, always at a whitespace character, so every
+    piece can be normalised on its own and the results joined with a single space.
+    """
+    chunks, start = [], 0
+    while len(text) - start > size:
+        m = _WS_RE.search(text, start + size)
+        if m is None:
+            break
+        chunks.append(text[start:m.start()])
+        start = m.end()
+    chunks.append(text[start:])
+    return chunks
+
+
+# -----------------------------
+# BATCHES
+# -----------------------------
+class TextNormaliser:
+    """
+    Normalise text columns of rows as they are produced.
+    Thread-safe; the process pool is started on the first long text and stopped by close(). Its
+    processes are spawned, not forked: the first long text may arrive on a fetch or result thread.
+    """
+
+    def __init__(self, columns, workers: int = WORKERS, long_text_chars: int = LONG_TEXT_CHARS):
+        self.columns = tuple(columns)
+        self.workers = workers
+        self.long_text_chars = long_text_chars
+        self.stats = {"values": 0, "unique": 0, "memo_hits": 0, "chunked": 0}
+        self._memo = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def normalise_values(self, values) -> dict:
+        """{value: normalised value} for every distinct string in `values`."""
+        distinct = {v for v in values if isinstance(v, str)}
+        out, todo = {}, []
+        with self._lock:
+            for v in distinct:
+                if v in self._memo:
+                    out[v] = self._memo[v]
+                    self.stats["memo_hits"] += 1
+                else:
+                    todo.append(v)
+            self.stats["unique"] += len(todo)
+
+        long_texts = [v for v in todo if len(v) > self.long_text_chars]
+        for v in todo:
+            if len(v) <= self.long_text_chars:
+                out[v] = normalise_text(v)
+        if long_texts:
+            out.update(self._normalise_long(long_texts))
+
+        with self._lock:
+            for v in todo:
+                if len(v) <= MEMO_MAX_CHARS and len(self._memo) < MEMO_MAX_ENTRIES:
+                    self._memo[v] = out[v]
+        return out
+
+    def _normalise_long(self, texts: list[str]) -> dict:
+        pieces = [split_chunks(t) for t in texts]
+        flat = [c for p in pieces for c in p]
+        with self._lock:
+            self.stats["chunked"] += len(texts)
+            if self._pool is None and self.workers > 1:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            pool = self._pool
+        done = list(pool.map(normalise_text, flat)) if pool else [normalise_text(c) for c in flat]
+
+        out, i = {}, 0
+        for text, p in zip(texts, pieces):
+            out[text] = " ".join(c for c in done[i:i + len(p)] if c)
+            i += len(p)
+        return out
+
+    def normalise_rows(self, rows: list[dict]) -> list[dict]:
+        """Normalise the configured columns of `rows` in place (and return them)."""
+        values = [r.get(c) for r in rows for c in self.columns]
+        with self._lock:
+            self.stats["values"] += sum(isinstance(v, str) for v in values)
+        fixed = self.normalise_values(values)
+        for r in rows:
+            for c in self.columns:
+                v = r.get(c)
+                if isinstance(v, str):
+                    r[c] = fixed[v]
+        return rows
+
+    def normalise_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of `df` with the configured columns normalised (each distinct value once)."""
+        df = df.copy()
+        for c in self.columns:
+            if c not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[c])
+            values = [v if isinstance(v, str) else None for v in uniques]
+            with self._lock:
+                self.stats["values"] += int((codes >= 0).sum())
+            fixed = self.normalise_values(values)
+            mapped = pd.array([fixed.get(v, v) for v in values], dtype="string")
+            df[c] = pd.Series(mapped.take(codes, allow_fill=True), index=df.index, dtype="string")
+        return df
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['values']} values, {s['unique']} normalised, {s['memo_hits']} reused, "
+                f"{s['chunked']} long texts chunked" + ("" if fix_text else " (ftfy not installed)"))
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None) -> int:
+    from row_writer import ARTICLE_SCHEMA, ITEM_SCHEMA, RowWriter, read_table
+
+    ap = argparse.ArgumentParser(description="Normalise the text columns of a pipeline table.")
+    ap.add_argument("input")
+    ap.add_argument("output")
+    ap.add_argument("--columns", nargs="+", default=list(ITEM_TEXT_COLUMNS + ARTICLE_TEXT_COLUMNS))
+    args = ap.parse_args(argv)
+
+    schema = {**ITEM_SCHEMA, **ARTICLE_SCHEMA}
+    t0 = time.perf_counter()
+    df = read_table(args.input, schema=schema)
+    with TextNormaliser(args.columns) as normaliser:
+        df = normaliser.normalise_frame(df)
+    with RowWriter(args.output, schema=schema) as writer:
+        writer.write_frame(df)
+    print(f"🧽 {normaliser.summary()} in {time.perf_counter() - t0:.2f}s")
+    print(f"✅ Wrote {writer.rows_written} rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+# Deduplicated, compressed storage for scraped article text.
+# article_text is by far the largest column the pipeline keeps, and it used to be copied into every
+# store row (again on every re-scrape) and onto every merged item that cites the same article.
+# Here each distinct text is stored once, zlib-compressed, in an append-only blob file; rows carry a
+# 16-character text_ref (a 64-bit content hash) instead; the articles table, the articles CSV and
+# the merged CSV all carry only the ref. Storing a text that is already present
+# returns its ref without writing anything, so identical re-scrapes take no new space.
+#
+# Layout under TEXT_STORE_DIR:
+#   texts.blob   compressed texts, back to back
+#   texts.idx    fixed 24-byte records: key (8 bytes) | offset (u64) | compressed size (u32) | text size (u32)
+#   texts.lock   held (flock) by the one process writing to the store
+# The blob is memory-mapped for reads, so looking up one text touches only its own bytes, and
+# tables can be loaded without any text at all; attach_text() fills article_text on demand.
+# Only extract01 (and PipelineDB moving an old database's texts over) write; everything that reads
+# texts opens the store read-only.
+#
+#   from text_store import attach_text
+#   df = attach_text(pd.read_csv(".../newsletter_full_articles_with_items.csv"))
+
+import argparse
+import fcntl
+import hashlib
+import mmap
+import os
+import sys
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+TEXT_STORE_DIR = "/workspaces/ERP_Newsletter/data/data04_full_articles_scraped/article_texts"
+COMPRESSION_LEVEL = 6
+
+INDEX_DTYPE = np.dtype([("key", "S8"), ("offset", "<u8"), ("clen", "<u4"), ("rlen", "<u4")])
+
+
+def text_ref(text: str) -> str:
+    """Content reference of a text: 16 hex characters of its BLAKE2b hash."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+# -----------------------------
+# STORE
+# -----------------------------
+class TextStore:
+    """
+    Append-only, content-addressed text store. put() / get() are thread-safe.
+    Index records are written after their blob bytes, and with `sync` both are on disk before put()
+    returns, so a ref handed to a row that is committed afterwards never outlives its text in a
+    crash.
+
+    One process writes at a time: a writer holds an exclusive lock on texts.lock while it is open,
+    and only a writer truncates what an interrupted write left at the end of either file.
+    readonly=True (what the readers use) creates, locks and modifies nothing, so it works on a
+    read-only copy and next to a running writer; it sees the texts complete when it was opened.
+    """
+
+    def __init__(self, root: str = TEXT_STORE_DIR, sync: bool = True, readonly: bool = False):
+        self.root = root
+        self.sync = sync
+        self.readonly = readonly
+        self.blob_path = os.path.join(root, "texts.blob")
+        self.index_path = os.path.join(root, "texts.idx")
+        self._lock = threading.Lock()
+        self._mm = None
+        self._blob = self._index = self._lockfile = None
+        self.stats = {"puts": 0, "new": 0, "bytes_in": 0, "bytes_stored": 0}
+
+        if not readonly:
+            os.makedirs(root, exist_ok=True)
+            self._lockfile = open(os.path.join(root, "texts.lock"), "ab")
+            try:
+                fcntl.flock(self._lockfile.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lockfile.close()
+                raise RuntimeError(f"Text store {root} is already open for writing in another process")
+        blob_size = os.path.getsize(self.blob_path) if os.path.exists(self.blob_path) else 0
+        index = np.fromfile(self.index_path, dtype=INDEX_DTYPE) if os.path.exists(self.index_path) else \
+            np.empty(0, dtype=INDEX_DTYPE)
+        # Records are appended in blob order, so the complete ones form a prefix of the index
+        ends = index["offset"] + index["clen"]
+        complete = len(index) if (ends <= blob_size).all() else int(np.argmin(ends <= blob_size))
+        end = int(ends[complete - 1]) if complete else 0
+        index = index[:complete]
+        if not readonly and (complete != len(ends) or end != blob_size):
+            # Interrupted write: drop the partial tail of both files before appending again
+            for path, size in ((self.index_path, complete * INDEX_DTYPE.itemsize), (self.blob_path, end)):
+                with open(path, "ab") as f:
+                    f.truncate(size)
+        self._entries = {bytes(r["key"]): (int(r["offset"]), int(r["clen"]), int(r["rlen"])) for r in index}
+        if not readonly:
+            self._blob = open(self.blob_path, "ab")
+            self._index = open(self.index_path, "ab")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            for f in (self._blob, self._index, self._lockfile):
+                if f is not None:
+                    f.close()  # closing the lock file releases the writer lock
+            self._blob = self._index = self._lockfile = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, ref: str) -> bool:
+        return bytes.fromhex(ref) in self._entries
+
+    # ---- write ----
+    def put(self, text: str | None) -> str | None:
+        """Store `text` (if new) and return its ref; None for missing / empty text."""
+        if not text:
+            return None
+        if self.readonly:
+            raise ValueError(f"Text store {self.root} was opened read-only")
+        raw = text.encode("utf-8")
+        key = hashlib.blake2b(raw, digest_size=8).digest()
+        with self._lock:
+            self.stats["puts"] += 1
+            self.stats["bytes_in"] += len(raw)
+            if key not in self._entries:
+                data = zlib.compress(raw, COMPRESSION_LEVEL)
+                offset = self._blob.tell()
+                self._blob.write(data)
+                self._blob.flush()
+                if self.sync:
+                    os.fsync(self._blob.fileno())
+                record = np.array([(key, offset, len(data), len(raw))], dtype=INDEX_DTYPE)
+                self._index.write(record.tobytes())
+                self._index.flush()
+                if self.sync:
+                    os.fsync(self._index.fileno())
+                self._entries[key] = (offset, len(data), len(raw))
+                self.stats["new"] += 1
+                self.stats["bytes_stored"] += len(data)
+        return key.hex()
+
+    # ---- read ----
+    def get(self, ref: str | None) -> str | None:
+        if not isinstance(ref, str) or not ref:
+            return None
+        entry = self._entries.get(bytes.fromhex(ref))
+        if entry is None:
+            return None
+        offset, clen, _ = entry
+        with self._lock:
+            if self._mm is None or offset + clen > len(self._mm):
+                # (Re)map after appends; the blob only ever grows
+                if self._mm is not None:
+                    self._mm.close()
+                if self._blob is not None:
+                    self._blob.flush()
+                with open(self.blob_path, "rb") as f:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            data = self._mm[offset:offset + clen]
+        return zlib.decompress(data).decode("utf-8")
+
+    def get_many(self, refs) -> dict:
+        """{ref: text} for the distinct refs in `refs` (unknown refs are left out)."""
+        out = {}
+        for ref in set(r for r in refs if isinstance(r, str) and r):
+            text = self.get(ref)
+            if text is not None:
+                out[ref] = text
+        return out
+
+    def summary(self) -> str:
+        s = self.stats
+        saved = 1 - s["bytes_stored"] / s["bytes_in"] if s["bytes_in"] else 0.0
+        return (f"{len(self)} texts; this run {s['puts']} stored, {s['new']} new, "
+                f"{s['bytes_in'] / 1e6:.1f} MB -> {s['bytes_stored'] / 1e6:.1f} MB written ({saved:.0%} saved)")
+
+
+# -----------------------------
+# TABLES
+# -----------------------------
+def attach_text(df: pd.DataFrame, store: TextStore | None = None, ref_column: str = "text_ref",
+                text_column: str = "article_text") -> pd.DataFrame:
+    """
+    `df` with `text_column` filled from the store wherever it is missing and a ref is present,
+    decoding each distinct text once. Tables without a ref column come back unchanged.
+    """
+    if ref_column not in df.columns:
+        return df
+    if store is None:
+        if not os.path.exists(os.path.join(TEXT_STORE_DIR, "texts.idx")):
+            print(f"⚠️  No text store at {TEXT_STORE_DIR}; {text_column} left as is")
+            return df
+        with TextStore(TEXT_STORE_DIR, readonly=True) as store:
+            return attach_text(df, store, ref_column, text_column)
+    df = df.copy()
+    if text_column not in df.columns:
+        df[text_column] = pd.Series(pd.NA, index=df.index, dtype="string")
+    missing = df[text_column].isna() & df[ref_column].notna()
+    texts = store.get_many(df.loc[missing, ref_column])
+    df.loc[missing, text_column] = df.loc[missing, ref_column].map(texts)
+    return df
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Report the size of an article text store.")
+    ap.add_argument("root", nargs="?", default=TEXT_STORE_DIR)
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.root, "texts.idx")):
+        print(f"❌ No text store at {args.root}")
+        return 1
+    with TextStore(args.root, readonly=True) as store:
+        entries = store._entries.values()
+        print(f"🗜️  {len(store)} texts, {sum(e[2] for e in entries) / 1e6:.1f} MB of text in "
+              f"{sum(e[1] for e in entries) / 1e6:.1f} MB (+ {os.path.getsize(store.index_path) / 1e3:.0f} kB index)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# URL normalisation shared by both extraction stages.
+# canonical_url unwraps Outlook SafeLinks, strips tracking parameters and normalises
+# scheme/host/path. The same links are canonicalised over and over (per item, again in the
+# dedupe pass, again in extract01), so results are memoised in a bounded LRU cache, and
+# canonicalise_many() does whole columns by unique value. UrlTable interns canonical URLs
+# to small integer ids for joins.
+
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
+
+import pandas as pd
+
+# Bounded memo: comfortably more than the distinct links in the whole archive
+URL_CACHE_SIZE = 65536
+
+SAFE_HOSTS = {
+    "eur01.safelinks.protection.outlook.com",
+    "safelinks.protection.outlook.com",
+    "nam01.safelinks.protection.outlook.com",
+    "emea01.safelinks.protection.outlook.com",
+}
+
+TRACK_PARAMS = {
+    "utm_source","utm_medium","utm_campaign","utm_term","utm_content",
+    "mkt_tok","mc_cid","mc_eid","gclid","fbclid","igshid","utm_name"
+}
+
+# -----------------------------
+# SINGLE URL HELPERS (memoised)
+# -----------------------------
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def is_safelink(u: str) -> bool:
+    try:
+        return urlparse(u).netloc.lower() in SAFE_HOSTS
+    except Exception:
+        return False
+
+def strip_tracking(u: str) -> str:
+    try:
+        p = urlparse(u)
+        q = parse_qs(p.query, keep_blank_values=True)
+        q2 = {k: v for k, v in q.items() if k.lower() not in TRACK_PARAMS}
+        return urlunparse(p._replace(query=urlencode(q2, doseq=True)))
+    except Exception:
+        return u
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def canonical_url(u: str) -> str:
+    """Prefer original src already applied; also unwrap SafeLinks and strip trackers."""
+    if not u:
+        return ""
+    u = u.strip()
+    # unwrap Office SafeLinks if no 'originalsrc' was captured
+    if is_safelink(u):
+        try:
+            q = parse_qs(urlparse(u).query)
+            inner = q.get("url", []) or q.get("URL", [])
+            if inner:
+                u = inner[0]
+        except Exception:
+            pass
+    u = strip_tracking(u)
+    # normalise scheme/host/path
+    try:
+        p = urlparse(u)
+        path = p.path.rstrip("/") or "/"
+        u = urlunparse((p.scheme.lower() or "https", p.netloc.lower(), path, "", p.query, ""))
+    except Exception:
+        pass
+    return u
+
+# -----------------------------
+# BATCH API
+# -----------------------------
+def canonicalise_many(values):
+    """
+    canonical_url over a pandas Series or any iterable, computed once per unique value.
+    Returns a Series (same index) for a Series input, else a list. Missing values map to "".
+    """
+    if isinstance(values, pd.Series):
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        mapped = [canonical_url(u) if isinstance(u, str) else "" for u in uniques]
+        # code -1 (missing) picks the trailing ""
+        lookup = pd.array(mapped + [""], dtype=object)
+        return pd.Series(lookup[codes], index=values.index, name=values.name, dtype=object)
+
+    seen = {}
+    out = []
+    for u in values:
+        if u not in seen:
+            seen[u] = canonical_url(u) if isinstance(u, str) else ""
+        out.append(seen[u])
+    return out
+
+# -----------------------------
+# INTERNED URL IDS
+# -----------------------------
+class UrlTable:
+    """
+    Interned canonical URLs: each distinct URL gets a small, stable integer id
+    (in order of first appearance), so tables can be joined on ints instead of long strings.
+    """
+
+    def __init__(self, urls=()):
+        self._ids = {}
+        self._urls = []
+        self.add_many(urls)
+
+    def __len__(self):
+        return len(self._urls)
+
+    def __contains__(self, url):
+        return url in self._ids
+
+    def add(self, url: str) -> int:
+        i = self._ids.get(url)
+        if i is None:
+            i = self._ids[url] = len(self._urls)
+            self._urls.append(url)
+        return i
+
+    def add_many(self, urls) -> list[int]:
+        return [self.add(u) for u in urls]
+
+    def id(self, url: str) -> int | None:
+        return self._ids.get(url)
+
+    def url(self, i: int) -> str:
+        return self._urls[i]
+
+    def ids(self, urls: pd.Series) -> pd.Series:
+        """Integer ids for a Series of canonical URLs (new URLs are interned; missing -> <NA>)."""
+        codes, uniques = pd.factorize(urls, use_na_sentinel=True)
+        lookup = pd.array([self.add(u) for u in uniques] + [None], dtype="Int64")
+        return pd.Series(lookup[codes], index=urls.index, name="link_id")
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"link_id": range(len(self._urls)), "link_canonical": self._urls})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "UrlTable":
+        table = cls()
+        for i, url in sorted(zip(df["link_id"], df["link_canonical"])):
+            if table.add(url) != i:
+                raise ValueError(f"UrlTable ids must be dense and ordered; got {i} for {url!r}")
+        return table